@@ -0,0 +1,8 @@
+"""
+Root pytest configuration
+"""
+
+# The game package under python/ shares the llamaquest name with the client
+# package here, so both can't be imported in one session. Its tests are run
+# on their own, with "python -m pytest python/tests" or from python/
+collect_ignore = ["python"]
@@ -4,6 +4,10 @@ LlamaQuest - A modern, retro-style adventure game with AI-driven NPCs
 
 __version__ = "0.1.0"
 
+from collections import OrderedDict
+
+import numpy as np
+
 # Import core modules for easier access
 from .game import GameEngine, run_game
 from .player import Player
@@ -22,103 +26,326 @@ try:
 except ImportError:
     _has_rust_core = False
     
+    # Numba is optional; when present the pathfinding fallback is JIT-compiled
+    try:
+        from numba import njit
+        _has_numba = True
+    except ImportError:
+        _has_numba = False
+    
+    if _has_numba:
+        @njit(cache=True, boundscheck=False)
+        def _astar_numba(grid, sx, sy, ex, ey, max_steps):
+            """A* over a uint8 walkable grid, returning the path as flat node indices"""
+            height, width = grid.shape
+            size = height * width
+            
+            # Per-node state, nodes are encoded as y * width + x
+            g_score = np.full(size, 2147483647, np.int32)
+            came_from = np.full(size, -1, np.int32)
+            closed = np.zeros(size, np.uint8)
+            
+            # Binary min-heap keyed by f_score; each expansion pushes at most 4 nodes
+            capacity = 4 * size + 1
+            heap_key = np.empty(capacity, np.int32)
+            heap_node = np.empty(capacity, np.int32)
+            heap_size = 1
+            
+            start = sy * width + sx
+            goal = ey * width + ex
+            g_score[start] = 0
+            heap_key[0] = 0
+            heap_node[0] = start
+            expanded = 0
+            
+            while heap_size > 0 and expanded < max_steps:
+                # Pop the minimum and sift the last entry down from the root
+                node = heap_node[0]
+                heap_size -= 1
+                key = heap_key[heap_size]
+                item = heap_node[heap_size]
+                i = 0
+                while True:
+                    child = 2 * i + 1
+                    if child >= heap_size:
+                        break
+                    if child + 1 < heap_size and heap_key[child + 1] < heap_key[child]:
+                        child += 1
+                    if heap_key[child] >= key:
+                        break
+                    heap_key[i] = heap_key[child]
+                    heap_node[i] = heap_node[child]
+                    i = child
+                heap_key[i] = key
+                heap_node[i] = item
+                
+                if node == goal:
+                    # Count the path length, then fill it in start-to-goal order
+                    length = 1
+                    cur = node
+                    while cur != start:
+                        cur = came_from[cur]
+                        length += 1
+                    path = np.empty(length, np.int32)
+                    cur = node
+                    for j in range(length - 1, -1, -1):
+                        path[j] = cur
+                        cur = came_from[cur]
+                    return path
+                
+                # Skip nodes already visited
+                if closed[node]:
+                    continue
+                closed[node] = 1
+                expanded += 1
+                
+                x = node % width
+                y = node // width
+                ng_score = g_score[node] + 1
+                
+                # Check neighbors
+                for k in range(4):
+                    nx = x
+                    ny = y
+                    if k == 0:
+                        ny = y + 1
+                    elif k == 1:
+                        nx = x + 1
+                    elif k == 2:
+                        ny = y - 1
+                    else:
+                        nx = x - 1
+                    
+                    if nx < 0 or nx >= width or ny < 0 or ny >= height:
+                        continue
+                    neighbor = ny * width + nx
+                    if not grid[ny, nx] or closed[neighbor] or ng_score >= g_score[neighbor]:
+                        continue
+                    
+                    g_score[neighbor] = ng_score
+                    came_from[neighbor] = node
+                    nf_score = ng_score + abs(nx - ex) + abs(ny - ey)  # Manhattan distance
+                    
+                    # Push and sift up
+                    i = heap_size
+                    heap_size += 1
+                    while i > 0:
+                        parent = (i - 1) // 2
+                        if heap_key[parent] <= nf_score:
+                            break
+                        heap_key[i] = heap_key[parent]
+                        heap_node[i] = heap_node[parent]
+                        i = parent
+                    heap_key[i] = nf_score
+                    heap_node[i] = neighbor
+            
+            return np.empty(0, np.int32)
+    
     # Provide Python fallbacks for core functionality
     def calculate_pathfinding(start_x, start_y, end_x, end_y, walkable_map, max_steps=None):
         """Python fallback for pathfinding"""
-        import heapq
-        
         # A* pathfinding implementation
         if max_steps is None:
             max_steps = 1000
-            
-        # Create a grid for tracking visited cells
-        height = len(walkable_map)
-        width = len(walkable_map[0]) if height > 0 else 0
+        
+        # One byte per cell; arrays such as World.walkable_grid() are used as
+        # they are, nested lists are converted here
+        grid = np.ascontiguousarray(walkable_map, dtype=np.uint8)  # No copy for uint8
+        height, width = grid.shape if grid.ndim == 2 else (0, 0)
         
         # If start or end is out of bounds or not walkable, return empty path
-        if (start_x >= width or start_y >= height or end_x >= width or end_y >= height or
-            not walkable_map[start_y][start_x] or not walkable_map[end_y][end_x]):
+        if (not (0 <= start_x < width and 0 <= start_y < height and
+                 0 <= end_x < width and 0 <= end_y < height) or
+            not grid[start_y, start_x] or not grid[end_y, end_x]):
             return []
-            
-        # A* algorithm
-        open_set = [(0, 0, start_x, start_y, [])]  # (f_score, g_score, x, y, path)
-        closed_set = set()
         
-        while open_set and len(closed_set) < max_steps:
-            f_score, g_score, x, y, path = heapq.heappop(open_set)
+        if _has_numba:
+            nodes = _astar_numba(grid, start_x, start_y, end_x, end_y, max_steps)
+            return [(int(node % width), int(node // width)) for node in nodes]
+        
+        # Zero-copy flat row-major view, indexed as y * width + x
+        flat = memoryview(grid).cast("B", (width * height,))
+        return _astar_python(start_x, start_y, end_x, end_y, flat, width, height, max_steps)
+
+    class _BucketQueue:
+        """Monotone priority queue for small non-negative integer keys
+        
+        Each key owns a bucket and a cursor walks them upwards, so pushes and pops
+        are O(1) amortized. Keys pushed must not be below the last key popped,
+        which holds for A* f-scores under a consistent heuristic.
+        """
+        __slots__ = ("buckets", "current", "size")
+        
+        def __init__(self):
+            self.buckets = []
+            self.current = 0
+            self.size = 0
+        
+        def push(self, key, item):
+            buckets = self.buckets
+            while len(buckets) <= key:
+                buckets.append([])
+            buckets[key].append(item)
+            self.size += 1
+        
+        def pop_min(self):
+            """Remove and return (key, item) with the smallest key"""
+            buckets = self.buckets
+            current = self.current
+            while not buckets[current]:
+                current += 1
+            self.current = current
+            self.size -= 1
+            return current, buckets[current].pop()
+
+    def _astar_python(start_x, start_y, end_x, end_y, walkable, width, height, max_steps):
+        """Pure-Python A* over flat walkable[y * width + x], used without numba"""
+        # A* algorithm, cells are tracked by their flat index y * width + x
+        start = start_y * width + start_x
+        goal = end_y * width + end_x
+        open_set = _BucketQueue()  # Cells keyed by f_score
+        open_set.push(0, start)
+        g_best = {start: 0}  # Best known cost to reach each cell
+        came_from = {}  # Parent pointers for path reconstruction
+        closed = bytearray(width * height)  # 1 for visited cells
+        expanded = 0
+        
+        while open_set.size and expanded < max_steps:
+            _, node = open_set.pop_min()
             
             # Check if we reached the goal
-            if x == end_x and y == end_y:
-                return path + [(x, y)]
+            if node == goal:
+                # Walk parent pointers back to the start
+                path = [(end_x, end_y)]
+                while node != start:
+                    node = came_from[node]
+                    path.append((node % width, node // width))
+                path.reverse()
+                return path
                 
-            # Skip if already visited
-            if (x, y) in closed_set:
+            # Skip cells already visited; a cell re-pushed with a better
+            # score is always popped before its stale entries
+            if closed[node]:
                 continue
                 
             # Mark as visited
-            closed_set.add((x, y))
-            path = path + [(x, y)]
+            closed[node] = 1
+            expanded += 1
+            y, x = divmod(node, width)
+            ng_score = g_best[node] + 1
             
             # Check neighbors
             for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
                 nx, ny = x + dx, y + dy
+                neighbor = ny * width + nx
                 
-                if 0 <= nx < width and 0 <= ny < height and walkable_map[ny][nx] and (nx, ny) not in closed_set:
-                    ng_score = g_score + 1
-                    nh_score = abs(nx - end_x) + abs(ny - end_y)  # Manhattan distance
-                    nf_score = ng_score + nh_score
+                if 0 <= nx < width and 0 <= ny < height and walkable[neighbor] and not closed[neighbor]:
+                    if ng_score >= g_best.get(neighbor, ng_score + 1):
+                        continue
                     
-                    heapq.heappush(open_set, (nf_score, ng_score, nx, ny, path))
+                    g_best[neighbor] = ng_score
+                    came_from[neighbor] = node
+                    nh_score = abs(nx - end_x) + abs(ny - end_y)  # Manhattan distance
+                    open_set.push(ng_score + nh_score, neighbor)
         
         return []
 
     def collision_detection(entity1_x, entity1_y, entity1_width, entity1_height,
                           entity2_x, entity2_y, entity2_width, entity2_height):
         """Python fallback for collision detection"""
-        return (
-            entity1_x < entity2_x + entity2_width and
-            entity1_x + entity1_width > entity2_x and
-            entity1_y < entity2_y + entity2_height and
-            entity1_y + entity1_height > entity2_y
-        )
+        # Most pairs are separated horizontally, so reject on the X axis first
+        if entity2_x >= entity1_x + entity1_width or entity1_x >= entity2_x + entity2_width:
+            return False
+        return entity1_y < entity2_y + entity2_height and entity2_y < entity1_y + entity1_height
 
-    def calculate_field_of_view(origin_x, origin_y, radius, obstacle_map):
-        """Python fallback for FOV calculation"""
-        import math
-        
-        height = len(obstacle_map)
-        width = len(obstacle_map[0]) if height > 0 else 0
+    # Octant transforms (xx, xy, yx, yy) for recursive shadowcasting
+    _FOV_OCTANTS = (
+        (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+        (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+    )
+
+    def _cast_light(vis, obst, width, height, row, start_slope, end_slope, radius,
+                    xx, xy, yx, yy, ox, oy):
+        """Recursively scan one octant, splitting it at opaque cells
         
-        # Create visibility map
-        visibility_map = [[False for _ in range(width)] for _ in range(height)]
+        vis and obst are flat row-major width x height grids indexed as y * width + x.
+        """
+        if start_slope < end_slope:
+            return
         
-        # Origin is always visible
-        if 0 <= origin_y < height and 0 <= origin_x < width:
-            visibility_map[origin_y][origin_x] = True
+        radius_sq = radius * radius
+        new_start = 0.0
         
-        # Cast rays in a circle
-        for angle in range(0, 360, 5):  # Step by 5 degrees for performance
-            angle_rad = math.radians(angle)
-            ray_x, ray_y = float(origin_x), float(origin_y)
+        for j in range(row, radius + 1):
+            dx, dy = -j - 1, -j
+            blocked = False
             
-            for step in range(1, radius + 1):
-                ray_x += math.cos(angle_rad)
-                ray_y += math.sin(angle_rad)
+            while dx <= 0:
+                dx += 1
                 
-                # Round to get tile coordinates
-                tile_x, tile_y = round(ray_x), round(ray_y)
-                
-                # Check boundaries
-                if not (0 <= tile_y < height and 0 <= tile_x < width):
+                # Slopes of the cell's left and right edges
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start_slope < right_slope:
+                    continue
+                if end_slope > left_slope:
                     break
                 
+                # Transform to map coordinates; cells off the map count as opaque
+                x = ox + dx * xx + dy * xy
+                y = oy + dx * yx + dy * yy
+                in_bounds = 0 <= x < width and 0 <= y < height
+                opaque = not in_bounds or obst[y * width + x]
+                
                 # Mark as visible
-                visibility_map[tile_y][tile_x] = True
+                if in_bounds and dx * dx + dy * dy <= radius_sq:
+                    vis[y * width + x] = 1
                 
-                # Stop if hit obstacle
-                if obstacle_map[tile_y][tile_x]:
-                    break
+                if blocked:
+                    if opaque:
+                        new_start = right_slope
+                    else:
+                        blocked = False
+                        start_slope = new_start
+                elif opaque and j < radius:
+                    # Scan the lit part of the next row before the obstacle
+                    blocked = True
+                    _cast_light(vis, obst, width, height, j + 1, start_slope, left_slope, radius,
+                                xx, xy, yx, yy, ox, oy)
+                    new_start = right_slope
+            
+            if blocked:
+                break
+
+    def calculate_field_of_view(origin_x, origin_y, radius, obstacle_map):
+        """Python fallback for FOV calculation"""
+        obstacles = np.asarray(obstacle_map, dtype=bool)
+        height, width = obstacles.shape if obstacles.ndim == 2 else (0, 0)
         
+        # Create visibility map
+        visibility_map = np.zeros((height, width), dtype=bool)
+        
+        # Only the window within radius of the origin can become visible
+        x0, x1 = max(0, origin_x - radius), min(width, origin_x + radius + 1)
+        y0, y1 = max(0, origin_y - radius), min(height, origin_y + radius + 1)
+        if x0 >= x1 or y0 >= y1:
+            return visibility_map
+        
+        # Flat one-byte-per-cell copies of the window for the scan
+        w, h = x1 - x0, y1 - y0
+        obst = obstacles[y0:y1, x0:x1].tobytes()
+        vis = bytearray(w * h)
+        ox, oy = origin_x - x0, origin_y - y0
+        
+        # Origin is always visible
+        if 0 <= oy < h and 0 <= ox < w:
+            vis[oy * w + ox] = 1
+        
+        # Shadowcast each of the 8 octants
+        for xx, xy, yx, yy in _FOV_OCTANTS:
+            _cast_light(vis, obst, w, h, 1, 1.0, 0.0, radius, xx, xy, yx, yy, ox, oy)
+        
+        visibility_map[y0:y1, x0:x1] = np.frombuffer(vis, dtype=np.uint8).reshape(h, w)
         return visibility_map
 
     class PhysicsEngine:
@@ -150,6 +377,45 @@ except ImportError:
             
             return ((new_position_x, new_position_y), (new_velocity_x, new_velocity_y))
 
+# Recent FOV results for the current obstacle map, least recently used first
+_FOV_CACHE_SIZE = 64
+_fov_cache = OrderedDict()
+_fov_cache_map = None
+
+def cached_field_of_view(origin_x, origin_y, radius, obstacle_map, map_version=0):
+    """Field of view with results cached across ticks
+    
+    Results are keyed on (origin, radius, map_version), so callers must pass a
+    version that changes whenever the obstacle map is mutated. Passing a
+    different obstacle map object drops the whole cache, so callers should
+    keep one map object alive; World.field_of_view passes its persistent
+    World.obstacle_map() with World.version. The returned array is shared
+    between calls and read-only.
+    """
+    global _fov_cache_map
+    if obstacle_map is not _fov_cache_map:
+        _fov_cache.clear()
+        _fov_cache_map = obstacle_map
+    
+    key = (origin_x, origin_y, radius, map_version)
+    visibility_map = _fov_cache.get(key)
+    if visibility_map is not None:
+        _fov_cache.move_to_end(key)
+        return visibility_map
+    
+    visibility_map = np.asarray(calculate_field_of_view(origin_x, origin_y, radius, obstacle_map), dtype=bool)
+    visibility_map.flags.writeable = False
+    _fov_cache[key] = visibility_map
+    if len(_fov_cache) > _FOV_CACHE_SIZE:
+        _fov_cache.popitem(last=False)
+    return visibility_map
+
+def clear_fov_cache():
+    """Forget all cached FOV results"""
+    global _fov_cache_map
+    _fov_cache.clear()
+    _fov_cache_map = None
+
 def has_rust_core():
     """Check if Rust core is available"""
     return _has_rust_core 
\ No newline at end of file
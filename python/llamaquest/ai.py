@@ -2,9 +2,14 @@
 AI module for LlamaQuest - Provides NPC behavior and dialogue generation
 """
 
+import operator
 import random
+import re
+import numpy as np
+from collections import Counter, deque
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 class NPCMood(Enum):
     FRIENDLY = "friendly"
@@ -14,90 +19,186 @@ class NPCMood(Enum):
     CURIOUS = "curious"
 
 class NPCPersonality:
+    """Personality traits of an NPC, each a float between 0 and 1"""
+    
+    # Trait names and the range random values are drawn from
+    TRAIT_RANGES = {
+        "friendliness": (0.2, 0.8),
+        "intelligence": (0.3, 0.9),
+        "courage": (0.2, 0.9),
+        "patience": (0.3, 0.8),
+        "curiosity": (0.2, 0.9),
+    }
+    
+    # Values live in "_<trait>" slots behind the trait properties defined
+    # below the class, whose setters invalidate the dominant trait cache
+    __slots__ = tuple("_" + name for name in TRAIT_RANGES) + ("_dominant",)
+    
     def __init__(self, traits: Dict[str, float] = None):
-        self.traits = traits or {
-            "friendliness": random.uniform(0.2, 0.8),
-            "intelligence": random.uniform(0.3, 0.9),
-            "courage": random.uniform(0.2, 0.9),
-            "patience": random.uniform(0.3, 0.8),
-            "curiosity": random.uniform(0.2, 0.9),
-        }
+        traits = traits or {}
+        for name, (low, high) in self.TRAIT_RANGES.items():
+            value = traits[name] if name in traits else random.uniform(low, high)
+            setattr(self, name, value)
+        self._dominant = None
+    
+    @classmethod
+    def create_batch(cls, n: int, rng: np.random.Generator = None) -> List["NPCPersonality"]:
+        """Create n personalities, drawing all of their random traits at once"""
+        if rng is None:
+            # Seed from the random module so random.seed() keeps worlds reproducible
+            rng = np.random.default_rng(random.getrandbits(64))
+        names = tuple(cls.TRAIT_RANGES)
+        low, high = zip(*cls.TRAIT_RANGES.values())
+        values = rng.uniform(low, high, (n, len(names)))
+        return [cls(dict(zip(names, row))) for row in values.tolist()]
+    
+    @property
+    def traits(self) -> Mapping[str, float]:
+        """All traits as a read-only name -> value mapping"""
+        return MappingProxyType({name: getattr(self, name) for name in self.TRAIT_RANGES})
+    
+    def set_trait(self, name: str, value: float):
+        """Change a trait by name after creation"""
+        if name not in self.TRAIT_RANGES:
+            raise KeyError(name)
+        setattr(self, name, value)
         
     def get_dominant_trait(self) -> Tuple[str, float]:
-        return max(self.traits.items(), key=lambda x: x[1])
+        if self._dominant is None:
+            self._dominant = max(self.traits.items(), key=lambda x: x[1])
+        return self._dominant
+
+def _trait_property(name: str) -> property:
+    """Property for one trait; setting it drops the cached dominant trait"""
+    slot = "_" + name
+    
+    def set_value(self, value: float):
+        setattr(self, slot, value)
+        self._dominant = None
+    
+    return property(operator.attrgetter(slot), set_value, doc=f"The {name} trait")
+
+for _name in NPCPersonality.TRAIT_RANGES:
+    setattr(NPCPersonality, _name, _trait_property(_name))
+del _name
 
 class DialogueGenerator:
     """Generates contextual dialogue for NPCs based on their personality and situation"""
     
     TEMPLATES = {
-        NPCMood.FRIENDLY: [
+        NPCMood.FRIENDLY: (
             "Hello there, adventurer! Can I help you with anything?",
             "It's a pleasure to meet you! What brings you to these parts?",
             "Welcome, friend! I've been hoping to meet someone new.",
             "Ah, a visitor! We don't get many of those around here.",
-        ],
-        NPCMood.NEUTRAL: [
+        ),
+        NPCMood.NEUTRAL: (
             "Yes? What do you want?",
             "I'm a bit busy right now.",
             "Do you need something?",
             "State your business, traveler.",
-        ],
-        NPCMood.HOSTILE: [
+        ),
+        NPCMood.HOSTILE: (
             "Back off if you know what's good for you.",
             "I don't take kindly to strangers.",
             "You've got some nerve coming here.",
             "Keep your distance, outsider.",
-        ],
-        NPCMood.SCARED: [
+        ),
+        NPCMood.SCARED: (
             "P-please don't hurt me!",
             "I don't want any trouble!",
             "Stay back! I'm warning you!",
             "Oh no, please just leave me alone!",
-        ],
-        NPCMood.CURIOUS: [
+        ),
+        NPCMood.CURIOUS: (
             "Interesting... where did you come from?",
             "I've never seen someone like you before. Tell me more!",
             "What strange items you're carrying! May I take a closer look?",
             "You seem to have traveled far. What stories can you share?",
-        ],
+        ),
     }
     
     @classmethod
     def generate_greeting(cls, personality: NPCPersonality, current_mood: NPCMood) -> str:
         """Generate an appropriate greeting based on NPC personality and mood"""
-        templates = cls.TEMPLATES.get(current_mood, cls.TEMPLATES[NPCMood.NEUTRAL])
-        return random.choice(templates)
+        templates, count = _GREETINGS.get(current_mood, _DEFAULT_GREETINGS)
+        return templates[int(_random() * count)]
+
+# (templates, count) per mood, so picking a greeting costs a single dict lookup
+_GREETINGS = {mood: (templates, len(templates)) for mood, templates in DialogueGenerator.TEMPLATES.items()}
+_DEFAULT_GREETINGS = _GREETINGS[NPCMood.NEUTRAL]
+_random = random.random
+
+# Keywords in a player action that change an NPC's mood
+_ATTACK_KWS = frozenset({"attack"})
+_FRIEND_KWS = frozenset({"gift", "help"})
+_Q_KWS = frozenset({"question"})
+# Finds every keyword anywhere in the action, like a substring test would, so
+# "attacking", "give_gift" and "counterattack" all count
+_KEYWORD_RE = re.compile("|".join(map(re.escape, sorted(_ATTACK_KWS | _FRIEND_KWS | _Q_KWS))))
 
 class NPCBehavior:
     """Controls NPC behavior, decisions, and reactions to player actions"""
     
-    def __init__(self, npc_id: str, name: str):
+    __slots__ = ("npc_id", "name", "personality", "mood", "memory",
+                 "action_counts", "last_mood", "x", "y")
+    
+    MEMORY_SIZE = 16
+    
+    def __init__(self, npc_id: str, name: str, personality: NPCPersonality = None,
+                 x: int = 0, y: int = 0):
         self.npc_id = npc_id
         self.name = name
-        self.personality = NPCPersonality()
+        # World position in pixels; move through GameState.move_npc so the
+        # spatial hash stays current
+        self.x = x
+        self.y = y
+        self.personality = personality or NPCPersonality()
         self.mood = NPCMood.NEUTRAL
-        self.memory = []  # track interactions with player
+        # Running summary of interactions with the player: how often each
+        # kind of action happened, and the mood the last one left us in
+        self.action_counts = Counter()
+        self.last_mood = NPCMood.NEUTRAL
+        # Short-term memory of (action, resulting_mood); only the most
+        # recent MEMORY_SIZE are kept, older ones fall off automatically
+        self.memory = deque(maxlen=self.MEMORY_SIZE)
         
     def update_mood(self, player_action: str, context: Dict) -> NPCMood:
         """Update NPC mood based on player actions and context"""
         # Simple mood simulation based on personality traits
-        friendliness = self.personality.traits["friendliness"]
+        personality = self.personality
+        keywords = set(_KEYWORD_RE.findall(player_action.lower()))
         
-        if "attack" in player_action.lower():
-            self.mood = NPCMood.HOSTILE if self.personality.traits["courage"] > 0.7 else NPCMood.SCARED
-        elif "gift" in player_action.lower() or "help" in player_action.lower():
+        if keywords & _ATTACK_KWS:
+            action_key = "attack"
+            self.mood = NPCMood.HOSTILE if personality.courage > 0.7 else NPCMood.SCARED
+        elif keywords & _FRIEND_KWS:
+            action_key = "friendly"
             self.mood = NPCMood.FRIENDLY
-        elif "question" in player_action.lower():
-            if self.personality.traits["curiosity"] > 0.6:
+        elif keywords & _Q_KWS:
+            action_key = "question"
+            if personality.curiosity > 0.6:
                 self.mood = NPCMood.CURIOUS
             else:
                 self.mood = NPCMood.NEUTRAL
+        else:
+            action_key = "other"
         
         # Record interaction in memory
-        self.memory.append({"action": player_action, "resulting_mood": self.mood})
+        self.action_counts[action_key] += 1
+        self.last_mood = self.mood
+        self.memory.append((player_action, self.mood))
         
         return self.mood
     
+    def recent_summary(self) -> Dict:
+        """Summarize past interactions for AI context consumers"""
+        return {
+            "action_counts": dict(self.action_counts),
+            "last_mood": self.last_mood,
+            "interactions": sum(self.action_counts.values()),
+        }
+    
     def decide_action(self, game_state: Dict) -> str:
         """Decide what action the NPC should take based on game state and personality"""
         # Simple decision tree based on personality and mood
@@ -111,7 +212,8 @@ class NPCBehavior:
             return "flee_from_player"
         
         elif self.mood == NPCMood.FRIENDLY:
-            if random.random() < self.personality.traits["helpfulness"]:
+            # Friendlier NPCs are more likely to offer help
+            if random.random() < self.personality.friendliness:
                 return "offer_help"
             else:
                 return "engage_conversation"
@@ -131,10 +233,12 @@ def create_npc_manager(num_npcs: int = 5) -> Dict[str, NPCBehavior]:
     """Create and initialize a group of NPCs with random personalities"""
     npc_names = ["Elwin", "Gorm", "Thalia", "Zeph", "Mira", "Krag", "Lyra", "Finn", "Orla", "Vex"]
     npcs = {}
+    count = min(num_npcs, len(npc_names))
+    personalities = NPCPersonality.create_batch(count)
     
-    for i in range(min(num_npcs, len(npc_names))):
+    for i in range(count):
         npc_id = f"npc_{i+1}"
         name = npc_names[i]
-        npcs[npc_id] = NPCBehavior(npc_id, name)
+        npcs[npc_id] = NPCBehavior(npc_id, name, personalities[i])
     
     return npcs 
\ No newline at end of file
@@ -2,9 +2,13 @@
 Entities module for LlamaQuest - Defines game objects, items, NPCs and interactive elements
 """
 
+import math
+import operator
+import numpy as np
 import pyxel
-from typing import Dict, List, Tuple, Optional, Callable
+from typing import Dict, Iterable, List, Tuple, Optional, Callable
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from enum import Enum
 
 class EntityType(Enum):
@@ -17,11 +21,384 @@ class EntityType(Enum):
     PROJECTILE = 5
     EFFECT = 6
 
+# Positions may be fractional (physics moves in sub-pixel steps)
+_COLUMN_DTYPE = np.float32
+
+
+def _empty_column() -> np.ndarray:
+    """Create an empty entity column"""
+    return np.zeros(0, dtype=_COLUMN_DTYPE)
+
+
+@dataclass
+class EntityArrays:
+    """Structure-of-arrays storage for entity positions and sizes"""
+    xs: np.ndarray = field(default_factory=_empty_column)
+    ys: np.ndarray = field(default_factory=_empty_column)
+    ws: np.ndarray = field(default_factory=_empty_column)
+    hs: np.ndarray = field(default_factory=_empty_column)
+    count: int = 0
+    
+    @property
+    def capacity(self) -> int:
+        """Number of rows allocated in each column"""
+        return len(self.xs)
+    
+    def reserve(self, capacity: int):
+        """Grow every column to hold at least capacity rows"""
+        if capacity <= self.capacity:
+            return
+        for name in ("xs", "ys", "ws", "hs"):
+            column = np.zeros(capacity, dtype=_COLUMN_DTYPE)
+            column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+
+
+def broadphase_pairs(arrays: EntityArrays) -> np.ndarray:
+    """Find index pairs (i, j), i < j, whose bounding boxes overlap"""
+    n = arrays.count
+    xs, ys = arrays.xs[:n], arrays.ys[:n]
+    ws, hs = arrays.ws[:n], arrays.hs[:n]
+    
+    # Overlap on both axes, tested for all pairs at once
+    overlap_x = (xs[:, None] < xs[None, :] + ws[None, :]) & (xs[None, :] < xs[:, None] + ws[:, None])
+    overlap_y = (ys[:, None] < ys[None, :] + hs[None, :]) & (ys[None, :] < ys[:, None] + hs[:, None])
+    return np.argwhere(np.triu(overlap_x & overlap_y, 1))
+
+
+Box = Tuple[int, int, int, int]  # (x0, y0, x1, y1)
+
+
+def _union(a: Box, b: Box) -> Box:
+    """Smallest box enclosing both boxes"""
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _perimeter(box: Box) -> int:
+    """Perimeter of a box, used as the insertion cost metric"""
+    return 2 * ((box[2] - box[0]) + (box[3] - box[1]))
+
+
+class _TreeNode:
+    """A node of the AABB tree; leaves have no children and carry a key"""
+    __slots__ = ("box", "key", "parent", "left", "right", "height")
+    
+    def __init__(self, box: Box, key=None):
+        self.box = box
+        self.key = key
+        self.parent = None
+        self.left = None
+        self.right = None
+        self.height = 0
+
+
+class AABBTree:
+    """Dynamic AABB tree for broadphase queries
+    
+    Leaves store fattened boxes, so objects that move a little stay inside
+    their leaf and update() leaves the tree untouched.
+    """
+    
+    def __init__(self, margin: int = 8):
+        """Initialize an empty tree, fattening leaves by margin pixels"""
+        self.margin = margin
+        self.root = None
+        self.leaves = {}
+    
+    def __len__(self) -> int:
+        return len(self.leaves)
+    
+    def _fatten(self, box: Box) -> Box:
+        m = self.margin
+        return (box[0] - m, box[1] - m, box[2] + m, box[3] + m)
+    
+    def insert(self, key, box: Box):
+        """Insert an object under key with the given box"""
+        if key in self.leaves:
+            self.remove(key)
+        leaf = _TreeNode(self._fatten(box), key)
+        self.leaves[key] = leaf
+        self._insert_leaf(leaf)
+    
+    def update(self, key, box: Box) -> bool:
+        """Move an object, returns True if the tree had to be restructured"""
+        leaf = self.leaves.get(key)
+        if leaf is None:
+            self.insert(key, box)
+            return True
+            
+        # Still inside the fat box: nothing to do
+        fx0, fy0, fx1, fy1 = leaf.box
+        x0, y0, x1, y1 = box
+        if fx0 <= x0 and fy0 <= y0 and x1 <= fx1 and y1 <= fy1:
+            return False
+            
+        self._remove_leaf(leaf)
+        leaf.box = self._fatten(box)
+        self._insert_leaf(leaf)
+        return True
+    
+    def remove(self, key):
+        """Remove the object stored under key, if any"""
+        leaf = self.leaves.pop(key, None)
+        if leaf is not None:
+            self._remove_leaf(leaf)
+    
+    def query(self, box: Box) -> list:
+        """Get the keys of all objects whose fat boxes overlap box"""
+        results = []
+        if self.root is None:
+            return results
+            
+        x0, y0, x1, y1 = box
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            nx0, ny0, nx1, ny1 = node.box
+            if nx0 >= x1 or nx1 <= x0 or ny0 >= y1 or ny1 <= y0:
+                continue
+            if node.left is None:
+                results.append(node.key)
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+        return results
+    
+    def _insert_leaf(self, leaf: _TreeNode):
+        if self.root is None:
+            self.root = leaf
+            leaf.parent = None
+            return
+            
+        # Descend to the sibling that grows the tree's perimeter the least
+        box = leaf.box
+        node = self.root
+        while node.left is not None:
+            combined = _perimeter(_union(node.box, box))
+            cost = 2 * combined
+            inherited = 2 * (combined - _perimeter(node.box))
+            
+            child_costs = []
+            for child in (node.left, node.right):
+                grown = _perimeter(_union(child.box, box))
+                if child.left is not None:
+                    grown -= _perimeter(child.box)
+                child_costs.append(grown + inherited)
+            cost_left, cost_right = child_costs
+            
+            if cost < cost_left and cost < cost_right:
+                break
+            node = node.left if cost_left < cost_right else node.right
+        
+        # Join the leaf and its sibling under a new parent
+        sibling = node
+        old_parent = sibling.parent
+        parent = _TreeNode(_union(sibling.box, box))
+        parent.parent = old_parent
+        parent.height = sibling.height + 1
+        parent.left = sibling
+        parent.right = leaf
+        sibling.parent = parent
+        leaf.parent = parent
+        if old_parent is None:
+            self.root = parent
+        elif old_parent.left is sibling:
+            old_parent.left = parent
+        else:
+            old_parent.right = parent
+            
+        self._refit(parent.parent)
+    
+    def _remove_leaf(self, leaf: _TreeNode):
+        if leaf is self.root:
+            self.root = None
+            return
+            
+        parent = leaf.parent
+        grandparent = parent.parent
+        sibling = parent.right if parent.left is leaf else parent.left
+        leaf.parent = None
+        
+        # The sibling takes the parent's place
+        sibling.parent = grandparent
+        if grandparent is None:
+            self.root = sibling
+            return
+        if grandparent.left is parent:
+            grandparent.left = sibling
+        else:
+            grandparent.right = sibling
+        self._refit(grandparent)
+    
+    def _refit(self, node: Optional[_TreeNode]):
+        """Rebalance and recompute boxes from node up to the root"""
+        while node is not None:
+            node = self._balance(node)
+            left, right = node.left, node.right
+            node.height = 1 + max(left.height, right.height)
+            node.box = _union(left.box, right.box)
+            node = node.parent
+    
+    def _replace_child(self, old: _TreeNode, new: _TreeNode):
+        parent = new.parent
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+    
+    def _balance(self, a: _TreeNode) -> _TreeNode:
+        """Rotate the taller grandchild up if a is unbalanced, returns the subtree root"""
+        if a.left is None or a.height < 2:
+            return a
+            
+        b, c = a.left, a.right
+        balance = c.height - b.height
+        
+        if balance > 1:
+            # Rotate c up
+            f, g = c.left, c.right
+            c.left = a
+            c.parent = a.parent
+            a.parent = c
+            self._replace_child(a, c)
+            if f.height > g.height:
+                c.right, a.right, g.parent = f, g, a
+            else:
+                c.right, a.right, f.parent = g, f, a
+            a.box = _union(b.box, a.right.box)
+            a.height = 1 + max(b.height, a.right.height)
+            c.box = _union(a.box, c.right.box)
+            c.height = 1 + max(a.height, c.right.height)
+            return c
+            
+        if balance < -1:
+            # Rotate b up
+            d, e = b.left, b.right
+            b.left = a
+            b.parent = a.parent
+            a.parent = b
+            self._replace_child(a, b)
+            if d.height > e.height:
+                b.right, a.left, e.parent = d, e, a
+            else:
+                b.right, a.left, d.parent = e, d, a
+            a.box = _union(c.box, a.left.box)
+            a.height = 1 + max(c.height, a.left.height)
+            b.box = _union(a.box, b.right.box)
+            b.height = 1 + max(a.height, b.right.height)
+            return b
+            
+        return a
+
+
+_blt_bank = operator.itemgetter(2)  # Image bank in a pyxel.blt argument tuple
+
+
+def draw_batched(entities: Iterable["Entity"]):
+    """Draw the visible entities in one pass, grouped by image bank"""
+    blt = pyxel.blt
+    batch = [entity._blt_args for entity in entities if entity.is_visible]
+    batch.sort(key=_blt_bank)  # Stable, so draw order is kept within a bank
+    for args in batch:
+        blt(*args)
+
+
+class EntityManager:
+    """Owns the SoA columns and broadphase tree for the entities of one game state"""
+    
+    def __init__(self, capacity: int = 64):
+        """Initialize the manager with room for capacity entities"""
+        self.arrays = EntityArrays()
+        self.arrays.reserve(capacity)
+        self.entities: List["Entity"] = []
+        self.tree = AABBTree()
+    
+    def __len__(self) -> int:
+        return len(self.entities)
+    
+    def __contains__(self, entity: "Entity") -> bool:
+        return entity._manager is self
+    
+    def add(self, entity: "Entity"):
+        """Give an entity a row in the columns and a leaf in the tree"""
+        if entity._manager is not None:
+            raise ValueError("entity already belongs to a manager")
+        arrays = self.arrays
+        index = arrays.count
+        if index >= arrays.capacity:
+            arrays.reserve(max(1, arrays.capacity * 2))
+        arrays.count += 1
+        x0, y0, _, _ = entity._aabb
+        arrays.xs[index] = x0
+        arrays.ys[index] = y0
+        arrays.ws[index] = entity.sprite_width
+        arrays.hs[index] = entity.sprite_height
+        self.entities.append(entity)
+        entity._manager = self
+        entity._index = index
+        self.tree.insert(entity, entity._aabb)
+    
+    def remove(self, entity: "Entity"):
+        """Drop an entity, moving the last row into its slot
+        
+        The entity keeps working on its own; its position changes just no
+        longer reach this manager.
+        """
+        if entity._manager is not self:
+            raise ValueError("entity does not belong to this manager")
+        arrays = self.arrays
+        index = entity._index
+        last = arrays.count - 1
+        if index != last:
+            for column in (arrays.xs, arrays.ys, arrays.ws, arrays.hs):
+                column[index] = column[last]
+            moved = self.entities[last]
+            moved._index = index
+            self.entities[index] = moved
+        self.entities.pop()
+        arrays.count -= 1
+        self.tree.remove(entity)
+        entity._manager = None
+        entity._index = None
+    
+    def broadphase_pairs(self) -> List[Tuple["Entity", "Entity"]]:
+        """Get pairs of entities whose bounding boxes overlap"""
+        entities = self.entities
+        return [(entities[i], entities[j]) for i, j in broadphase_pairs(self.arrays)]
+    
+    def draw_all(self):
+        """Draw every visible entity of this manager in one pass, grouped by image bank"""
+        draw_batched(self.entities)
+    
+    def distances_to(self, x: int, y: int) -> np.ndarray:
+        """Distance from every entity to a point, indexed by row"""
+        arrays = self.arrays
+        n = arrays.count
+        return np.hypot(arrays.xs[:n] - x, arrays.ys[:n] - y)
+
+
+# Smallest radius around the player queried once per frame for enemy AI; the
+# engine widens it to cover the furthest any enemy keeps tracking
+# (1.5x its detection_range)
+PLAYER_VICINITY_RANGE = 128
+
+
 class Entity(ABC):
     """Base class for all game entities"""
     
+    __slots__ = ("_manager", "_index", "_aabb", "_w", "_h", "_sprite", "_blt_args",
+                 "entity_type", "is_visible", "is_active", "collision_enabled")
+    
     def __init__(self, x: int, y: int, entity_type: EntityType, sprite_x: int, sprite_y: int):
-        """Initialize the entity"""
+        """Initialize the entity, not yet part of any game state"""
+        self._manager = None  # Set while an EntityManager holds a row for us
+        self._index = None
+        self._aabb = (0, 0, 0, 0)  # (x0, y0, x1, y1), kept in sync by the setters
+        self._w = 0  # Exact sprite size; the _aabb edges are derived from it
+        self._h = 0
+        self._sprite = (0, 0, 0)  # (bank, sprite_x, sprite_y)
         self.x = x
         self.y = y
         self.entity_type = entity_type
@@ -33,6 +410,108 @@ class Entity(ABC):
         self.is_visible = True
         self.is_active = True
         self.collision_enabled = True
+    
+    def _refresh_blt_args(self):
+        """Rebuild the cached pyxel.blt arguments after a position or sprite change"""
+        x0, y0, _, _ = self._aabb
+        bank, sprite_x, sprite_y = self._sprite
+        self._blt_args = (x0, y0, bank, sprite_x, sprite_y, self._w, self._h, 0)
+    
+    def _moved(self, column: str, value: float):
+        """Propagate a change of _aabb to the blit arguments and our manager, if any"""
+        self._refresh_blt_args()
+        manager = self._manager
+        if manager is not None:
+            getattr(manager.arrays, column)[self._index] = value
+            manager.tree.update(self, self._aabb)  # Cheap while inside the fat box
+    
+    # Position lives in _aabb and size in _w/_h, mirrored into the manager's
+    # columns while the entity belongs to one
+    @property
+    def x(self) -> float:
+        return self._aabb[0]
+    
+    @x.setter
+    def x(self, value: float):
+        _, y0, _, y1 = self._aabb
+        self._aabb = (value, y0, value + self._w, y1)
+        self._moved("xs", value)
+    
+    @property
+    def y(self) -> float:
+        return self._aabb[1]
+    
+    @y.setter
+    def y(self, value: float):
+        x0, _, x1, _ = self._aabb
+        self._aabb = (x0, value, x1, value + self._h)
+        self._moved("ys", value)
+    
+    @property
+    def sprite_width(self) -> int:
+        return self._w
+    
+    @sprite_width.setter
+    def sprite_width(self, value: int):
+        self._w = value
+        x0, y0, _, y1 = self._aabb
+        self._aabb = (x0, y0, x0 + value, y1)
+        self._moved("ws", value)
+    
+    @property
+    def sprite_height(self) -> int:
+        return self._h
+    
+    @sprite_height.setter
+    def sprite_height(self, value: int):
+        self._h = value
+        x0, y0, x1, _ = self._aabb
+        self._aabb = (x0, y0, x1, y0 + value)
+        self._moved("hs", value)
+    
+    @property
+    def sprite_bank(self) -> int:
+        return self._sprite[0]
+    
+    @sprite_bank.setter
+    def sprite_bank(self, value: int):
+        _, sprite_x, sprite_y = self._sprite
+        self._sprite = (value, sprite_x, sprite_y)
+        self._refresh_blt_args()
+    
+    @property
+    def sprite_x(self) -> int:
+        return self._sprite[1]
+    
+    @sprite_x.setter
+    def sprite_x(self, value: int):
+        bank, _, sprite_y = self._sprite
+        self._sprite = (bank, value, sprite_y)
+        self._refresh_blt_args()
+    
+    @property
+    def sprite_y(self) -> int:
+        return self._sprite[2]
+    
+    @sprite_y.setter
+    def sprite_y(self, value: int):
+        bank, sprite_x, _ = self._sprite
+        self._sprite = (bank, sprite_x, value)
+        self._refresh_blt_args()
+    
+    @property
+    def bounds(self) -> Box:
+        """Bounding box as (x0, y0, x1, y1)"""
+        return self._aabb
+    
+    def refresh_bounds(self):
+        """Sync the entity's box in its manager's broadphase tree
+        
+        The position and size setters already do this; it is only needed
+        after the tree itself was rebuilt.
+        """
+        if self._manager is not None:
+            self._manager.tree.update(self, self.bounds)
         
     def update(self, game_state):
         """Update entity state - to be overridden by subclasses"""
@@ -41,32 +520,24 @@ class Entity(ABC):
     def draw(self):
         """Draw the entity at its current position"""
         if self.is_visible:
-            pyxel.blt(
-                self.x, self.y,
-                self.sprite_bank,
-                self.sprite_x, self.sprite_y,
-                self.sprite_width, self.sprite_height,
-                0  # Transparent color
-            )
+            pyxel.blt(*self._blt_args)  # Transparent color 0
     
     def collides_with(self, other) -> bool:
         """Check if this entity collides with another"""
         if not (self.collision_enabled and other.collision_enabled):
             return False
             
-        # Simple box collision
-        return (
-            self.x < other.x + other.sprite_width and
-            self.x + self.sprite_width > other.x and
-            self.y < other.y + other.sprite_height and
-            self.y + self.sprite_height > other.y
-        )
+        # Simple box collision; edges are precomputed in _aabb, and most
+        # pairs are separated horizontally, so reject on the X axis first
+        ax0, ay0, ax1, ay1 = self._aabb
+        bx0, by0, bx1, by1 = other._aabb
+        if bx0 >= ax1 or ax0 >= bx1:
+            return False
+        return ay0 < by1 and by0 < ay1
     
     def distance_to(self, other) -> float:
         """Calculate distance to another entity"""
-        dx = self.x - other.x
-        dy = self.y - other.y
-        return (dx**2 + dy**2)**0.5
+        return math.hypot(self.x - other.x, self.y - other.y)
 
 
 class ItemType(Enum):
@@ -251,43 +722,63 @@ class Enemy(Entity):
         if self.attack_timer > 0:
             self.attack_timer -= 1
         
-        # Update behavior based on state
-        if self.state == "idle":
-            # Chance to start patrolling
-            if pyxel.frame_count % 180 == 0 and len(self.patrol_points) > 0:
-                self.state = "patrol"
-                
-            # Check for player detection
-            player_distance = self.distance_to(game_state.player)
-            if player_distance <= self.detection_range:
-                self.state = "chase"
-        
-        elif self.state == "patrol":
-            self.patrol_behavior(game_state)
+        # Update behavior based on state, measuring the player distance once
+        tick = self._STATE_FNS.get(self.state)
+        if tick is not None:
+            tick(self, game_state, self.player_distance(game_state))
+    
+    def _idle_tick(self, game_state, player_distance: float):
+        # Chance to start patrolling
+        if pyxel.frame_count % 180 == 0 and len(self.patrol_points) > 0:
+            self.state = "patrol"
             
-            # Check for player detection
-            player_distance = self.distance_to(game_state.player)
-            if player_distance <= self.detection_range:
-                self.state = "chase"
+        # Check for player detection
+        if player_distance <= self.detection_range:
+            self.state = "chase"
+    
+    def _patrol_tick(self, game_state, player_distance: float):
+        self.patrol_behavior(game_state)
         
-        elif self.state == "chase":
-            self.chase_behavior(game_state)
-            
-            # Check if in attack range
-            player_distance = self.distance_to(game_state.player)
-            if player_distance <= self.attack_range:
-                self.state = "attack"
-            elif player_distance > self.detection_range * 1.5:
-                # Lost player, go back to idle
-                self.state = "idle"
+        # Check for player detection
+        if player_distance <= self.detection_range:
+            self.state = "chase"
+    
+    def _chase_tick(self, game_state, player_distance: float):
+        self.chase_behavior(game_state)
         
-        elif self.state == "attack":
-            self.attack_behavior(game_state)
-            
-            # Check if still in attack range
-            player_distance = self.distance_to(game_state.player)
-            if player_distance > self.attack_range:
-                self.state = "chase"
+        # Check if in attack range
+        if player_distance <= self.attack_range:
+            self.state = "attack"
+        elif player_distance > self.detection_range * 1.5:
+            # Lost player, go back to idle
+            self.state = "idle"
+    
+    def _attack_tick(self, game_state, player_distance: float):
+        self.attack_behavior(game_state)
+        
+        # Check if still in attack range
+        if player_distance > self.attack_range:
+            self.state = "chase"
+    
+    # Per-frame handler for each state
+    _STATE_FNS = {
+        "idle": _idle_tick,
+        "patrol": _patrol_tick,
+        "chase": _chase_tick,
+        "attack": _attack_tick,
+    }
+    
+    def player_distance(self, game_state) -> float:
+        """Distance to the player, infinite if provably out of reach
+        
+        Enemies outside game_state.player_vicinity are further from the player
+        than player_vicinity_range. That is only trusted when the range covers
+        this enemy's tracking distance; otherwise the distance is measured.
+        """
+        if (self not in game_state.player_vicinity
+                and self.detection_range * 1.5 <= game_state.player_vicinity_range):
+            return math.inf
+        return self.distance_to(game_state.player)
     
     def patrol_behavior(self, game_state):
         """Handle patrol behavior"""
@@ -318,28 +809,19 @@ class Enemy(Entity):
     
     def move_toward(self, target_x: int, target_y: int, game_state):
         """Move toward a target position"""
-        dx = 0
-        dy = 0
-        
-        if self.x < target_x:
-            dx = self.movement_speed
-        elif self.x > target_x:
-            dx = -self.movement_speed
-            
-        if self.y < target_y:
-            dy = self.movement_speed
-        elif self.y > target_y:
-            dy = -self.movement_speed
-        
-        # Simple collision check with world
-        new_x = self.x + dx
-        new_y = self.y + dy
+        # Signum of the offset on each axis, scaled by speed
+        x, y = self.x, self.y
+        dx = ((target_x > x) - (target_x < x)) * self.movement_speed
+        dy = ((target_y > y) - (target_y < y)) * self.movement_speed
         
-        if game_state.world.is_position_walkable(new_x, self.y):
-            self.x = new_x
+        # Simple collision check with world, skipped on axes we don't move along
+        world = game_state.world
+        if dx and world.is_position_walkable(x + dx, y):
+            x += dx
+            self.x = x
             
-        if game_state.world.is_position_walkable(self.x, new_y):
-            self.y = new_y
+        if dy and world.is_position_walkable(x, y + dy):
+            self.y = y + dy
     
     def take_damage(self, amount: int) -> bool:
         """Handle enemy taking damage, returns True if still alive"""
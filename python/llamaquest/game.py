@@ -2,25 +2,56 @@
 Core game module for LlamaQuest - Main gameplay loop and game state management
 """
 
+import sys
 import time
+from itertools import chain
 import pyxel
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass, field
 
 from .ai import create_npc_manager, NPCBehavior
 from .world import World, load_world
 from .player import Player
-from .entities import Entity, Item, InteractiveObject
+from .entities import (Entity, EntityManager, Item, InteractiveObject, Enemy, draw_batched,
+                       PLAYER_VICINITY_RANGE)
 
-@dataclass
+# Quarters of the 20-minute day cycle, in order
+TIMES_OF_DAY = ("morning", "afternoon", "evening", "night")
+
+# Actors are only updated every frame near the camera's view
+NPC_CELL_SIZE = 64  # Pixels per side of a spatial hash cell
+UPDATE_MARGIN = 32  # Pixels beyond the screen edges that still count as on screen
+NPC_IDLE_INTERVAL = 1.0  # Seconds of game time between off-screen NPC idle ticks
+
+# Movement keys, read every frame
+KEY_LEFT, KEY_RIGHT = pyxel.KEY_LEFT, pyxel.KEY_RIGHT
+KEY_UP, KEY_DOWN = pyxel.KEY_UP, pyxel.KEY_DOWN
+
+UI_HEIGHT = 30  # Pixels at the top of the screen covered by the HUD
+
+# Slotted dataclasses need Python 3.10; older versions keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class GameState:
     """Represents the complete game state"""
     player: Player
     world: World
     npcs: Dict[str, NPCBehavior]
+    # World objects; add and remove them through add_entity/remove_entity so
+    # entity_manager, which backs the broadphase, stays in step
     entities: List[Entity] = field(default_factory=list)
     items: List[Item] = field(default_factory=list)
     interactive_objects: List[InteractiveObject] = field(default_factory=list)
+    entity_manager: EntityManager = field(default_factory=EntityManager)
+    player_vicinity: Set[Entity] = field(default_factory=set)  # Entities near the player this frame
+    player_vicinity_range: float = 0.0  # Radius player_vicinity was queried with, 0 if never
+    # Radius the player_vicinity query needs: how far the furthest-tracking
+    # enemy follows the player. Kept current by add_entity/remove_entity;
+    # call refresh_tracking_range after changing an enemy's detection_range
+    tracking_range: float = PLAYER_VICINITY_RANGE
+    spatial_hash: Dict[Tuple[int, int], List[str]] = field(default_factory=dict)  # NPC ids per cell
     
     # Game state flags
     paused: bool = False
@@ -30,6 +61,63 @@ class GameState:
     # Time tracking
     game_time: float = 0.0
     last_update: float = 0.0
+    last_idle_tick: float = 0.0
+    
+    def __post_init__(self):
+        for entity in chain(self.entities, self.items, self.interactive_objects):
+            self.entity_manager.add(entity)
+        self.refresh_tracking_range()
+        self.rebuild_spatial_hash()
+    
+    def _entity_list(self, entity: Entity) -> list:
+        """The list of this state that holds entities of entity's kind"""
+        if isinstance(entity, Item):
+            return self.items
+        if isinstance(entity, InteractiveObject):
+            return self.interactive_objects
+        return self.entities
+    
+    def add_entity(self, entity: Entity):
+        """Place an entity in the world of this state"""
+        self.entity_manager.add(entity)
+        self._entity_list(entity).append(entity)
+        if isinstance(entity, Enemy):
+            self.tracking_range = max(self.tracking_range, entity.detection_range * 1.5)
+    
+    def remove_entity(self, entity: Entity):
+        """Take an entity out of the world of this state"""
+        self.entity_manager.remove(entity)
+        self._entity_list(entity).remove(entity)
+        self.player_vicinity.discard(entity)
+        if isinstance(entity, Enemy):
+            self.refresh_tracking_range()
+    
+    def refresh_tracking_range(self):
+        """Recompute tracking_range from the enemies in the state"""
+        self.tracking_range = max([PLAYER_VICINITY_RANGE] + [entity.detection_range * 1.5
+                                                             for entity in self.entities
+                                                             if isinstance(entity, Enemy)])
+    
+    def rebuild_spatial_hash(self):
+        """Bucket every NPC id by the cell containing its position"""
+        self.spatial_hash = {}
+        for npc_id, npc in self.npcs.items():
+            cell = (npc.x // NPC_CELL_SIZE, npc.y // NPC_CELL_SIZE)
+            self.spatial_hash.setdefault(cell, []).append(npc_id)
+    
+    def move_npc(self, npc_id: str, x: int, y: int):
+        """Move an NPC, re-bucketing it if it crossed into another cell"""
+        npc = self.npcs[npc_id]
+        old_cell = (npc.x // NPC_CELL_SIZE, npc.y // NPC_CELL_SIZE)
+        new_cell = (x // NPC_CELL_SIZE, y // NPC_CELL_SIZE)
+        npc.x, npc.y = x, y
+        
+        if new_cell != old_cell:
+            bucket = self.spatial_hash[old_cell]
+            bucket.remove(npc_id)
+            if not bucket:
+                del self.spatial_hash[old_cell]
+            self.spatial_hash.setdefault(new_cell, []).append(npc_id)
     
     def update_game_time(self):
         """Update the in-game time counter"""
@@ -53,6 +141,24 @@ class GameEngine:
             "start_level": "village"
         }
         
+        # (quarter index, name) of the last time-of-day lookup
+        self._tod_cache = (None, None)
+        
+        # Decision context handed to every NPC; update_npcs refreshes its
+        # entries in place instead of building a new dict
+        self._npc_context = {
+            "player_nearby": False,
+            "time_of_day": None,
+            # Add other relevant context
+        }
+        
+        # Pre-rendered HUD and overlay panels; the HUD is redrawn when the
+        # (health, quest) it shows changes
+        self._ui_img = None
+        self._ui_key = None
+        self._pause_img = None
+        self._game_over_img = None
+        
         # Initialize game components
         self.world = load_world(self.config["start_level"])
         self.player = Player(x=80, y=60)
@@ -84,32 +190,33 @@ class GameEngine:
     
     def update(self):
         """Update game state - called every frame"""
-        if pyxel.btnp(pyxel.KEY_Q):
+        # Bind per-frame lookups to locals once
+        btn, btnp = pyxel.btn, pyxel.btnp
+        state = self.state
+        
+        if btnp(pyxel.KEY_Q):
             pyxel.quit()
             
-        if self.state.paused:
-            if pyxel.btnp(pyxel.KEY_P):
-                self.state.paused = False
+        if state.paused:
+            if btnp(pyxel.KEY_P):
+                state.paused = False
             return
             
-        if pyxel.btnp(pyxel.KEY_P):
-            self.state.paused = True
+        if btnp(pyxel.KEY_P):
+            state.paused = True
             return
         
-        self.state.update_game_time()
-        
-        # Update player
-        if pyxel.btn(pyxel.KEY_LEFT):
-            self.player.move(-1, 0, self.world)
-        if pyxel.btn(pyxel.KEY_RIGHT):
-            self.player.move(1, 0, self.world)
-        if pyxel.btn(pyxel.KEY_UP):
-            self.player.move(0, -1, self.world)
-        if pyxel.btn(pyxel.KEY_DOWN):
-            self.player.move(0, 1, self.world)
+        state.update_game_time()
+        
+        # Update player, folding the arrow keys into one move per frame
+        player, world = self.player, self.world
+        dx = btn(KEY_RIGHT) - btn(KEY_LEFT)
+        dy = btn(KEY_DOWN) - btn(KEY_UP)
+        if dx or dy:
+            player.move(dx, dy, world)
             
         # Interaction key
-        if pyxel.btnp(pyxel.KEY_SPACE):
+        if btnp(pyxel.KEY_SPACE):
             self.handle_interaction()
             
         # Update NPCs and other entities
@@ -121,21 +228,17 @@ class GameEngine:
     
     def draw(self):
         """Render the game - called every frame after update"""
+        state = self.state
         pyxel.cls(0)
         
         # Draw world
         self.world.draw()
         
-        # Draw entities
-        for entity in self.state.entities:
-            entity.draw()
-            
-        # Draw interactive objects
-        for obj in self.state.interactive_objects:
-            obj.draw()
+        # Draw entities and interactive objects in one batched pass
+        draw_batched(chain(state.entities, state.interactive_objects))
             
         # Draw NPCs
-        for npc_id, npc in self.state.npcs.items():
+        for npc_id, npc in state.npcs.items():
             # This assumes NPCs have a position and sprite in the world
             # You would need to connect the AI behavior with actual entity positions
             pass
@@ -147,11 +250,11 @@ class GameEngine:
         self.draw_ui()
         
         # Draw pause screen if needed
-        if self.state.paused:
+        if state.paused:
             self.draw_pause_screen()
             
         # Draw game over screen if needed
-        if self.state.game_over:
+        if state.game_over:
             self.draw_game_over_screen()
     
     def handle_interaction(self):
@@ -174,19 +277,47 @@ class GameEngine:
     
     def update_npcs(self):
         """Update all NPCs based on their AI behavior"""
-        for npc_id, npc in self.state.npcs.items():
-            # Create a context for the NPC's decision making
-            game_context = {
-                "player_nearby": self.is_player_near_npc(npc_id),
-                "time_of_day": self.get_time_of_day(),
-                # Add other relevant context
-            }
+        # Global context is the same for every NPC, so set it once per frame
+        game_context = self._npc_context
+        game_context["time_of_day"] = self.get_time_of_day()
+        
+        # Collect the NPCs in cells overlapping the view before acting, since
+        # actions may move NPCs between cells
+        left, top, right, bottom = self.get_update_bounds()
+        spatial_hash = self.state.spatial_hash
+        visible_npcs = [
+            npc_id
+            for cell_y in range(top // NPC_CELL_SIZE, bottom // NPC_CELL_SIZE + 1)
+            for cell_x in range(left // NPC_CELL_SIZE, right // NPC_CELL_SIZE + 1)
+            for npc_id in spatial_hash.get((cell_x, cell_y), ())
+        ]
+        
+        npcs = self.state.npcs
+        for npc_id in visible_npcs:
+            # Fill in the NPC-specific part of the context
+            game_context["player_nearby"] = self.is_player_near_npc(npc_id)
             
             # Get the NPC's decision
-            action = npc.decide_action(game_context)
+            action = npcs[npc_id].decide_action(game_context)
             
             # Execute the action (in a real implementation, this would move the NPC, etc.)
             self.execute_npc_action(npc_id, action)
+        
+        # Off-screen NPCs only get a cheap idle tick, once per interval
+        if self.state.game_time - self.state.last_idle_tick >= NPC_IDLE_INTERVAL:
+            self.state.last_idle_tick = self.state.game_time
+            on_screen = set(visible_npcs)
+            for npc_id in npcs:
+                if npc_id not in on_screen:
+                    self.execute_npc_action(npc_id, "idle_activity")
+    
+    def get_update_bounds(self) -> Tuple[int, int, int, int]:
+        """World-space (left, top, right, bottom) box of actors updated every frame"""
+        left = self.world.camera_x - UPDATE_MARGIN
+        top = self.world.camera_y - UPDATE_MARGIN
+        return (left, top,
+                left + pyxel.width + 2 * UPDATE_MARGIN,
+                top + pyxel.height + 2 * UPDATE_MARGIN)
     
     def is_player_near_npc(self, npc_id: str) -> bool:
         """Check if the player is near a specific NPC"""
@@ -195,17 +326,13 @@ class GameEngine:
     
     def get_time_of_day(self) -> str:
         """Get the current time of day in the game world"""
-        # Calculate based on game_time
-        day_cycle = (self.state.game_time % 1200) / 1200  # 20-minute day cycle
-        
-        if 0.0 <= day_cycle < 0.25:
-            return "morning"
-        elif 0.25 <= day_cycle < 0.5:
-            return "afternoon"
-        elif 0.5 <= day_cycle < 0.75:
-            return "evening"
-        else:
-            return "night"
+        # 20-minute day cycle in four 5-minute quarters
+        quarter = int((self.state.game_time % 1200) / 300)
+        
+        # Only look the name up again when the quarter changes
+        if quarter != self._tod_cache[0]:
+            self._tod_cache = (quarter, TIMES_OF_DAY[quarter])
+        return self._tod_cache[1]
     
     def execute_npc_action(self, npc_id: str, action: str):
         """Execute an action for an NPC"""
@@ -214,8 +341,21 @@ class GameEngine:
     
     def update_entities(self):
         """Update all game entities"""
-        for entity in self.state.entities:
-            entity.update(self.state)
+        # One broadphase query serves every enemy's player-distance checks; it
+        # has to reach as far as any enemy keeps tracking the player
+        state = self.state
+        tree = state.entity_manager.tree
+        r = state.tracking_range
+        px, py = self.player.x, self.player.y
+        state.player_vicinity = set(tree.query((px - r, py - r, px + r, py + r)))
+        state.player_vicinity_range = r
+        
+        # Entities away from both the camera and the player are left alone
+        # until one of them comes near
+        active = state.player_vicinity.union(tree.query(self.get_update_bounds()))
+        for entity in state.entities:
+            if entity in active:
+                entity.update(state)
     
     def check_quests(self):
         """Check and update quest progress"""
@@ -225,28 +365,49 @@ class GameEngine:
     
     def draw_ui(self):
         """Draw game UI elements"""
+        ui_key = (self.player.health, self.state.current_quest)
+        if ui_key != self._ui_key:
+            self._render_ui()
+            self._ui_key = ui_key
+        
+        pyxel.blt(0, 0, self._ui_img, 0, 0, self._ui_img.width, UI_HEIGHT, 0)
+    
+    def _render_ui(self):
+        """Redraw the HUD into its cached image"""
+        if self._ui_img is None:
+            self._ui_img = pyxel.Image(self.config["screen_width"], UI_HEIGHT)
+        img = self._ui_img
+        img.cls(0)
+        
         # Draw health bar
-        pyxel.rect(5, 5, 5 + self.player.health, 10, 8)
-        pyxel.rectb(5, 5, 5 + 100, 10, 7)
+        img.rect(5, 5, 5 + self.player.health, 10, 8)
+        img.rectb(5, 5, 5 + 100, 10, 7)
         
         # Draw current quest indicator if any
         if self.state.current_quest:
-            pyxel.text(5, 20, f"Quest: {self.state.current_quest}", 7)
+            img.text(5, 20, f"Quest: {self.state.current_quest}", 7)
+    
+    @staticmethod
+    def _render_panel(title: str, title_x: int, hint: str) -> pyxel.Image:
+        """Render a static 80x40 overlay panel"""
+        img = pyxel.Image(80, 40)
+        img.rect(0, 0, 80, 40, 0)
+        img.rectb(0, 0, 80, 40, 7)
+        img.text(title_x, 15, title, 7)
+        img.text(5, 30, hint, 7)
+        return img
     
     def draw_pause_screen(self):
         """Draw the pause screen overlay"""
-        pyxel.rect(40, 40, 80, 40, 0)
-        pyxel.rectb(40, 40, 80, 40, 7)
-        pyxel.text(60, 55, "PAUSED", 7)
-        pyxel.text(45, 70, "Press P to continue", 7)
+        if self._pause_img is None:
+            self._pause_img = self._render_panel("PAUSED", 20, "Press P to continue")
+        pyxel.blt(40, 40, self._pause_img, 0, 0, 80, 40)
     
     def draw_game_over_screen(self):
         """Draw the game over screen"""
-        pyxel.rect(40, 40, 80, 40, 0)
-        pyxel.rectb(40, 40, 80, 40, 7)
-        pyxel.text(55, 55, "GAME OVER", 7)
-        pyxel.text(45, 70, "Press R to restart", 7)
-
+        if self._game_over_img is None:
+            self._game_over_img = self._render_panel("GAME OVER", 15, "Press R to restart")
+        pyxel.blt(40, 40, self._game_over_img, 0, 0, 80, 40)
 
 def run_game():
     """Entry point to start the game"""
@@ -4,11 +4,31 @@ World module for LlamaQuest - Handles world generation, loading, and rendering
 
 import json
 import os
+import numpy as np
 import pyxel
 import random
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, FrozenSet, List, Tuple, Optional, Set
 from enum import Enum
 
+# orjson is optional; when present world files are read and written with it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Numba is optional; without it the generation kernels run as plain Python
+try:
+    from numba import njit
+    _has_numba = True
+except ImportError:
+    _has_numba = False
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as it is"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 class TileType(Enum):
     """Types of tiles in the world"""
     EMPTY = 0
@@ -22,19 +42,183 @@ class TileType(Enum):
     ROCK = 8
     BRIDGE = 9
 
+_MAX_TILE_VALUE = max(tile.value for tile in TileType)
+
+# Tile types that block line of sight, as a table indexed by tile value
+_OPAQUE_LUT = np.zeros(256, dtype=bool)
+_OPAQUE_LUT[[tile.value for tile in (TileType.WALL, TileType.DOOR, TileType.TREE, TileType.ROCK)]] = True
+
+# Plain tile values for the generation kernels, which can't use the enum
+_FLOOR = TileType.FLOOR.value
+_WALL = TileType.WALL.value
+_WATER = TileType.WATER.value
+_GRASS = TileType.GRASS.value
+_PATH = TileType.PATH.value
+_TREE = TileType.TREE.value
+_ROCK = TileType.ROCK.value
+
+
+@njit(cache=True)
+def _scatter_on_grass(tiles, count, value):
+    """Set count random cells to value, keeping only those that are grass"""
+    height, width = tiles.shape
+    xs = np.random.randint(0, width, count)
+    ys = np.random.randint(0, height, count)
+    for i in range(count):
+        if tiles[ys[i], xs[i]] == _GRASS:
+            tiles[ys[i], xs[i]] = value
+
+
+@njit(cache=True)
+def _gen_random(tiles, seed):
+    """Fill tiles with grass, water bodies, paths, trees and rocks"""
+    np.random.seed(seed)
+    height, width = tiles.shape
+    
+    # First, fill with grass
+    tiles[:, :] = _GRASS
+    
+    # Generate some water bodies
+    num_water_bodies = np.random.randint(3, 9)
+    for _ in range(num_water_bodies):
+        center_x = np.random.randint(5, width - 4)
+        center_y = np.random.randint(5, height - 4)
+        size = np.random.randint(3, 11)
+        
+        y0, y1 = max(0, center_y - size), min(height, center_y + size)
+        x0, x1 = max(0, center_x - size), min(width, center_x + size)
+        # Create irregular water shapes
+        radii = size * np.random.uniform(0.7, 1.0, (y1 - y0, x1 - x0))
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                dist = np.sqrt((x - center_x) ** 2 + (y - center_y) ** 2)
+                if dist < radii[y - y0, x - x0]:
+                    tiles[y, x] = _WATER
+    
+    # Generate some paths, drawing the walk's random numbers in batches
+    batch = 4 * (width + height)
+    num_paths = np.random.randint(3, 7)
+    for _ in range(num_paths):
+        x = np.random.randint(0, width)
+        y = np.random.randint(0, height)
+        end_x = np.random.randint(0, width)
+        end_y = np.random.randint(0, height)
+        
+        # Simple path generation
+        step = batch
+        while x != end_x or y != end_y:
+            if step == batch:
+                rolls = np.random.random((batch, 2))
+                directions = np.random.randint(0, 4, batch)
+                step = 0
+            tiles[y, x] = _PATH
+            
+            # Move closer to destination
+            if x != end_x and rolls[step, 0] < 0.7:
+                x += 1 if x < end_x else -1
+            elif y != end_y and rolls[step, 1] < 0.7:
+                y += 1 if y < end_y else -1
+            else:
+                # Random movement to make paths less straight
+                direction = directions[step]
+                new_x = x + (direction == 0) - (direction == 1)
+                new_y = y + (direction == 2) - (direction == 3)
+                if 0 <= new_x < width and 0 <= new_y < height:
+                    x, y = new_x, new_y
+            step += 1
+    
+    # Add some trees, then some rocks, on random grass cells
+    area = width * height
+    _scatter_on_grass(tiles, np.random.randint(area // 50, area // 30 + 1), _TREE)
+    _scatter_on_grass(tiles, np.random.randint(area // 100, area // 70 + 1), _ROCK)
+
+
+@njit(cache=True)
+def _gen_dungeon(tiles, num_rooms, room_min_size, room_max_size, seed):
+    """Carve rooms and connecting corridors into tiles; returns the rooms as (x, y, w, h) rows"""
+    np.random.seed(seed)
+    height, width = tiles.shape
+    
+    # Start with all walls
+    tiles[:, :] = _WALL
+    
+    # Generate rooms; occupied marks accepted rooms plus a 1-tile border so
+    # an overlap test is one slice check instead of a scan over the rooms
+    rooms = np.empty((num_rooms, 4), dtype=np.int64)
+    occupied = np.zeros(tiles.shape, dtype=np.bool_)
+    count = 0
+    for _ in range(num_rooms):
+        # Random room size and position
+        w = np.random.randint(room_min_size, room_max_size + 1)
+        h = np.random.randint(room_min_size, room_max_size + 1)
+        x = np.random.randint(1, width - w)
+        y = np.random.randint(1, height - h)
+        
+        # Check if this room overlaps with or touches any existing room
+        if not occupied[y:y + h, x:x + w].any():
+            tiles[y:y + h, x:x + w] = _FLOOR
+            occupied[y - 1:y + h + 1, x - 1:x + w + 1] = True
+            rooms[count, 0] = x
+            rooms[count, 1] = y
+            rooms[count, 2] = w
+            rooms[count, 3] = h
+            count += 1
+    
+    # Connect each room to the previous room through the room centers
+    for i in range(1, count):
+        prev_x = rooms[i - 1, 0] + rooms[i - 1, 2] // 2
+        prev_y = rooms[i - 1, 1] + rooms[i - 1, 3] // 2
+        new_x = rooms[i, 0] + rooms[i, 2] // 2
+        new_y = rooms[i, 1] + rooms[i, 3] // 2
+        
+        # Randomly decide to start horizontally or vertically
+        if np.random.random() < 0.5:
+            tiles[prev_y, min(prev_x, new_x):max(prev_x, new_x) + 1] = _FLOOR
+            tiles[min(prev_y, new_y):max(prev_y, new_y) + 1, new_x] = _FLOOR
+        else:
+            tiles[min(prev_y, new_y):max(prev_y, new_y) + 1, prev_x] = _FLOOR
+            tiles[new_y, min(prev_x, new_x):max(prev_x, new_x) + 1] = _FLOOR
+    
+    return rooms[:count]
+
+
+def _run_kernel(kernel, *args):
+    """Call a generation kernel without disturbing NumPy's global RNG
+    
+    Compiled kernels seed numba's own RNG. Run as plain Python they seed
+    np.random itself, so its state is saved and restored around the call.
+    """
+    if _has_numba:
+        return kernel(*args)
+    state = np.random.get_state()
+    try:
+        return kernel(*args)
+    finally:
+        np.random.set_state(state)
+
+
 class World:
     """Represents the game world with tiles, regions, and navigation"""
     
+    __slots__ = ("width", "height", "tile_size", "name", "version", "tiles",
+                 "tile_properties", "blocked", "tile_sprites", "regions",
+                 "camera_x", "camera_y", "_walk_lut", "_walkable_tiles",
+                 "interactable", "_cache_img", "_cache_dirty", "_dirty_tiles",
+                 "_sprite_lut", "_obstacles", "_obstacles_version",
+                 "_walkable", "_walkable_version")
+    
     def __init__(self, width: int = 128, height: int = 128, tile_size: int = 8):
         """Initialize the world grid"""
         self.width = width
         self.height = height
         self.tile_size = tile_size
         self.name = "World"
+        self.version = 0  # Bumped on every change to tiles or tile properties
         
-        # Create empty tile grid
-        self.tiles = [[TileType.EMPTY for _ in range(width)] for _ in range(height)]
+        # Create empty tile grid, one TileType value per cell
+        self.tiles = np.full((height, width), TileType.EMPTY.value, dtype=np.uint8)
         self.tile_properties = {}  # Custom properties for specific tiles
+        self.blocked = np.zeros((height, width), dtype=bool)  # "blocked" property per cell
         
         # Sprite mapping for each tile type
         self.tile_sprites = {
@@ -49,6 +233,9 @@ class World:
             TileType.ROCK: (8, 24),
             TileType.BRIDGE: (16, 24)
         }
+        # The same mapping as a (value, 2) array indexed by tile value;
+        # rebuild it with _build_sprite_lut after changing tile_sprites
+        self._sprite_lut = self._build_sprite_lut()
         
         # List of regions in the world
         self.regions = {}
@@ -57,7 +244,13 @@ class World:
         self.camera_x = 0
         self.camera_y = 0
         
-        # Walkability rules
+        # Walkable cells as one byte each for pathfinding, refreshed in place
+        # when version moves on or the walkability rules change
+        self._walkable = np.zeros((height, width), dtype=np.uint8)
+        self._walkable_version = None
+        
+        # Walkability rules; assigning walkable_tiles rebuilds the lookup table
+        self._walk_lut = np.zeros(256, dtype=bool)
         self.walkable_tiles = {
             TileType.FLOOR,
             TileType.GRASS,
@@ -66,7 +259,29 @@ class World:
         }
         
         # Special tile positions
-        self.interactable_positions = set()  # Set of (x, y) tuples
+        self.interactable = np.zeros((height, width), dtype=bool)  # Per-tile flag
+        
+        # Sight-blocking cells, refreshed in place when version moves on
+        self._obstacles = np.zeros((height, width), dtype=bool)
+        self._obstacles_version = None
+        
+        # Offscreen render of the whole map, created on first draw once Pyxel
+        # is running; set_tile queues single tiles for redraw
+        self._cache_img = None
+        self._cache_dirty = True
+        self._dirty_tiles = set()
+    
+    @property
+    def walkable_tiles(self) -> FrozenSet[TileType]:
+        """Tile types the player can walk on"""
+        return self._walkable_tiles
+    
+    @walkable_tiles.setter
+    def walkable_tiles(self, tiles):
+        self._walkable_tiles = frozenset(tiles)
+        self._walk_lut[:] = False
+        self._walk_lut[[tile.value for tile in self._walkable_tiles]] = True
+        self._walkable_version = None
     
     def is_within_bounds(self, x: int, y: int) -> bool:
         """Check if position is within world bounds"""
@@ -76,12 +291,14 @@ class World:
         """Get the tile type at a position"""
         if not self.is_within_bounds(x, y):
             return TileType.EMPTY
-        return self.tiles[y][x]
+        return TileType(int(self.tiles[y, x]))
     
     def set_tile(self, x: int, y: int, tile_type: TileType):
         """Set the tile type at a position"""
         if self.is_within_bounds(x, y):
-            self.tiles[y][x] = tile_type
+            self.tiles[y, x] = tile_type.value
+            self.version += 1
+            self._dirty_tiles.add((x, y))
     
     def get_tile_properties(self, x: int, y: int) -> Dict:
         """Get properties for the tile at a position"""
@@ -92,6 +309,9 @@ class World:
         """Set properties for the tile at a position"""
         pos = (x, y)
         self.tile_properties[pos] = properties
+        if self.is_within_bounds(x, y):
+            self.blocked[y, x] = bool(properties.get("blocked", False))
+        self.version += 1
     
     def is_position_walkable(self, x: int, y: int) -> bool:
         """Check if a position is walkable"""
@@ -101,19 +321,44 @@ class World:
         
         if not self.is_within_bounds(tile_x, tile_y):
             return False
-            
-        tile = self.get_tile(tile_x, tile_y)
         
-        # Check general walkability
-        if tile not in self.walkable_tiles:
-            return False
-            
-        # Check specific tile properties
-        properties = self.get_tile_properties(tile_x, tile_y)
-        if properties.get("blocked", False):
-            return False
-            
-        return True
+        return bool(self._walk_lut[self.tiles[tile_y, tile_x]] and not self.blocked[tile_y, tile_x])
+    
+    def obstacle_map(self) -> np.ndarray:
+        """Bool grid of the tiles that block line of sight
+        
+        The same array is returned every time and updated in place, so it can
+        key caches together with version. It must not be modified.
+        """
+        if self._obstacles_version != self.version:
+            np.take(_OPAQUE_LUT, self.tiles, out=self._obstacles)
+            self._obstacles_version = self.version
+        return self._obstacles
+    
+    def walkable_grid(self) -> np.ndarray:
+        """uint8 grid, 1 for the tiles that can be walked on
+        
+        The same array is returned every time and updated in place, so
+        pathfinding reuses it instead of converting the map per search. It
+        must not be modified.
+        """
+        if self._walkable_version != self.version:
+            walkable = self._walkable
+            np.take(self._walk_lut, self.tiles, out=walkable.view(bool))
+            walkable[self.blocked] = 0
+            self._walkable_version = self.version
+        return self._walkable
+    
+    def find_path(self, start_x: int, start_y: int, end_x: int, end_y: int,
+                  max_steps: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Shortest walkable path between two tiles, [] if there is none"""
+        from . import calculate_pathfinding  # The package imports this module
+        return calculate_pathfinding(start_x, start_y, end_x, end_y, self.walkable_grid(), max_steps)
+    
+    def field_of_view(self, tile_x: int, tile_y: int, radius: int) -> np.ndarray:
+        """Read-only bool grid of the tiles visible from a tile, cached per version"""
+        from . import cached_field_of_view  # The package imports this module
+        return cached_field_of_view(tile_x, tile_y, radius, self.obstacle_map(), self.version)
     
     def is_position_interactable(self, x: int, y: int) -> bool:
         """Check if a position has an interactable element"""
@@ -121,15 +366,29 @@ class World:
         tile_x = x // self.tile_size
         tile_y = y // self.tile_size
         
-        return (tile_x, tile_y) in self.interactable_positions
+        if not self.is_within_bounds(tile_x, tile_y):
+            return False
+        
+        return bool(self.interactable[tile_y, tile_x])
+    
+    @property
+    def interactable_positions(self) -> FrozenSet[Tuple[int, int]]:
+        """Interactable (x, y) tile positions, built from the bitmap
+        
+        The set is a snapshot and immutable; change positions through
+        add_interactable_position and remove_interactable_position.
+        """
+        return frozenset(map(tuple, np.argwhere(self.interactable)[:, ::-1].tolist()))
     
     def add_interactable_position(self, x: int, y: int):
         """Mark a position as interactable"""
-        self.interactable_positions.add((x, y))
+        if self.is_within_bounds(x, y):
+            self.interactable[y, x] = True
     
     def remove_interactable_position(self, x: int, y: int):
         """Remove a position from interactable set"""
-        self.interactable_positions.discard((x, y))
+        if self.is_within_bounds(x, y):
+            self.interactable[y, x] = False
     
     def add_region(self, region_id: str, name: str, x: int, y: int, width: int, height: int):
         """Add a region to the world"""
@@ -141,42 +400,65 @@ class World:
             "height": height
         }
     
-    def draw(self):
-        """Draw the visible portion of the world"""
-        # Calculate visible tile range based on camera position
-        screen_width = pyxel.width
-        screen_height = pyxel.height
-        
-        # Convert camera position to tile coordinates
-        start_x = max(0, self.camera_x // self.tile_size)
-        start_y = max(0, self.camera_y // self.tile_size)
+    def invalidate_cache(self):
+        """Note a bulk change to the tiles; the render cache is rebuilt on next draw"""
+        self.version += 1
+        self._cache_dirty = True
+        self._dirty_tiles.clear()
+    
+    def _build_sprite_lut(self) -> np.ndarray:
+        """Pack tile_sprites into an array of (sprite_x, sprite_y) rows"""
+        lut = np.zeros((_MAX_TILE_VALUE + 1, 2), dtype=np.int16)
+        for tile, sprite in self.tile_sprites.items():
+            lut[tile.value] = sprite
+        return lut
+    
+    def _blit_cells(self, xs: np.ndarray, ys: np.ndarray):
+        """Blit the tiles at the given cells into the offscreen image"""
+        ts = self.tile_size
+        sprites = self._sprite_lut[self.tiles[ys, xs]]
+        blt = self._cache_img.blt
+        for x, y, sprite_x, sprite_y in zip((xs * ts).tolist(), (ys * ts).tolist(),
+                                            sprites[:, 0].tolist(), sprites[:, 1].tolist()):
+            blt(x, y, 0, sprite_x, sprite_y, ts, ts)
+    
+    def _rebuild_cache(self):
+        """Render every tile into the offscreen image"""
+        ts = self.tile_size
+        if self._cache_img is None:
+            self._cache_img = pyxel.Image(self.width * ts, self.height * ts)
+        img = self._cache_img
+        img.cls(0)
         
-        # Calculate how many tiles fit on screen
-        tiles_x = (screen_width // self.tile_size) + 2
-        tiles_y = (screen_height // self.tile_size) + 2
+        # Blit tiles grouped by type, so identical blits run back to back
+        order = np.argsort(self.tiles, axis=None, kind="stable")
+        ys, xs = np.divmod(order, self.width)
+        self._blit_cells(xs, ys)
         
-        # Ensure we don't go beyond the world boundaries
-        end_x = min(start_x + tiles_x, self.width)
-        end_y = min(start_y + tiles_y, self.height)
+        self._cache_dirty = False
+        self._dirty_tiles.clear()
+    
+    def _redraw_dirty_tiles(self):
+        """Re-blit the tiles changed by set_tile since the last draw"""
+        xs, ys = np.array(list(self._dirty_tiles)).T
+        self._blit_cells(xs, ys)
+        self._dirty_tiles.clear()
+    
+    def draw(self):
+        """Draw the visible portion of the world"""
+        if self._cache_dirty or self._cache_img is None:
+            self._rebuild_cache()
+        elif self._dirty_tiles:
+            self._redraw_dirty_tiles()
         
-        # Draw visible tiles
-        for y in range(start_y, end_y):
-            for x in range(start_x, end_x):
-                tile = self.tiles[y][x]
-                sprite_x, sprite_y = self.tile_sprites[tile]
-                
-                # Calculate screen position
-                screen_x = (x * self.tile_size) - self.camera_x
-                screen_y = (y * self.tile_size) - self.camera_y
-                
-                # Draw the tile
-                pyxel.blt(
-                    screen_x, screen_y,
-                    0,  # Image bank
-                    sprite_x, sprite_y,
-                    self.tile_size, self.tile_size,
-                    0  # Transparent color
-                )
+        # One blit of the camera's view of the pre-rendered map
+        pyxel.blt(
+            0, 0,
+            self._cache_img,
+            self.camera_x, self.camera_y,
+            pyxel.width, pyxel.height,
+            0  # Transparent color
+        )
     
     def center_camera_on(self, x: int, y: int):
         """Center the camera on a position"""
@@ -202,180 +484,106 @@ class World:
     
     def generate_empty_world(self):
         """Generate an empty world with floor tiles"""
-        for y in range(self.height):
-            for x in range(self.width):
-                self.tiles[y][x] = TileType.FLOOR
+        self.invalidate_cache()
+        self.tiles.fill(TileType.FLOOR.value)
     
     def generate_random_world(self, seed: int = None):
         """Generate a random world with various terrain types"""
+        self.invalidate_cache()
         if seed is not None:
             random.seed(seed)
-        
-        # First, fill with grass
-        for y in range(self.height):
-            for x in range(self.width):
-                self.tiles[y][x] = TileType.GRASS
-        
-        # Generate some water bodies
-        num_water_bodies = random.randint(3, 8)
-        for _ in range(num_water_bodies):
-            center_x = random.randint(5, self.width - 5)
-            center_y = random.randint(5, self.height - 5)
-            size = random.randint(3, 10)
-            
-            for y in range(center_y - size, center_y + size):
-                for x in range(center_x - size, center_x + size):
-                    if self.is_within_bounds(x, y):
-                        # Create irregular water shapes
-                        dist = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
-                        if dist < size * random.uniform(0.7, 1.0):
-                            self.tiles[y][x] = TileType.WATER
-        
-        # Generate some paths
-        num_paths = random.randint(3, 6)
-        for _ in range(num_paths):
-            start_x = random.randint(0, self.width - 1)
-            start_y = random.randint(0, self.height - 1)
-            end_x = random.randint(0, self.width - 1)
-            end_y = random.randint(0, self.height - 1)
-            
-            # Simple path generation
-            x, y = start_x, start_y
-            while (x, y) != (end_x, end_y):
-                self.tiles[y][x] = TileType.PATH
-                
-                # Move closer to destination
-                if x < end_x and random.random() < 0.7:
-                    x += 1
-                elif x > end_x and random.random() < 0.7:
-                    x -= 1
-                elif y < end_y and random.random() < 0.7:
-                    y += 1
-                elif y > end_y and random.random() < 0.7:
-                    y -= 1
-                else:
-                    # Random movement to make paths less straight
-                    dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-                    dx, dy = random.choice(dirs)
-                    new_x, new_y = x + dx, y + dy
-                    if self.is_within_bounds(new_x, new_y):
-                        x, y = new_x, new_y
-        
-        # Add some trees
-        num_trees = random.randint(self.width * self.height // 50, self.width * self.height // 30)
-        for _ in range(num_trees):
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            if self.tiles[y][x] == TileType.GRASS:
-                self.tiles[y][x] = TileType.TREE
-        
-        # Add some rocks
-        num_rocks = random.randint(self.width * self.height // 100, self.width * self.height // 70)
-        for _ in range(num_rocks):
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            if self.tiles[y][x] == TileType.GRASS:
-                self.tiles[y][x] = TileType.ROCK
+        # Kernel seed drawn from random, so random.seed() reproduces worlds
+        _run_kernel(_gen_random, self.tiles, random.getrandbits(32))
     
     def generate_dungeon(self, num_rooms: int = 10, room_min_size: int = 3, room_max_size: int = 8):
         """Generate a dungeon with rooms and corridors"""
-        # Start with all walls
-        for y in range(self.height):
-            for x in range(self.width):
-                self.tiles[y][x] = TileType.WALL
-        
-        # Generate rooms
-        rooms = []
-        for _ in range(num_rooms):
-            # Random room size and position
-            w = random.randint(room_min_size, room_max_size)
-            h = random.randint(room_min_size, room_max_size)
-            x = random.randint(1, self.width - w - 1)
-            y = random.randint(1, self.height - h - 1)
-            
-            # Check if this room overlaps with any existing room
-            overlaps = False
-            for room in rooms:
-                rx, ry, rw, rh = room
-                if (x < rx + rw and x + w > rx and
-                    y < ry + rh and y + h > ry):
-                    overlaps = True
-                    break
-            
-            if not overlaps:
-                # Create the room
-                for room_y in range(y, y + h):
-                    for room_x in range(x, x + w):
-                        self.tiles[room_y][room_x] = TileType.FLOOR
-                
-                # Add room to list
-                rooms.append((x, y, w, h))
-        
-        # Connect rooms with corridors
-        for i in range(1, len(rooms)):
-            # Connect each room to the previous room
-            prev_room = rooms[i - 1]
-            new_room = rooms[i]
-            
-            # Center points of rooms
-            prev_x = prev_room[0] + prev_room[2] // 2
-            prev_y = prev_room[1] + prev_room[3] // 2
-            new_x = new_room[0] + new_room[2] // 2
-            new_y = new_room[1] + new_room[3] // 2
-            
-            # Randomly decide to start horizontally or vertically
-            if random.random() < 0.5:
-                # First horizontal, then vertical
-                self.create_horizontal_tunnel(prev_x, new_x, prev_y)
-                self.create_vertical_tunnel(prev_y, new_y, new_x)
-            else:
-                # First vertical, then horizontal
-                self.create_vertical_tunnel(prev_y, new_y, prev_x)
-                self.create_horizontal_tunnel(prev_x, new_x, new_y)
+        self.invalidate_cache()
+        # Rooms and corridors are carved natively; doors are placed here since
+        # they also register interactable positions
+        rooms = _run_kernel(_gen_dungeon, self.tiles, num_rooms, room_min_size,
+                            room_max_size, random.getrandbits(32))
         
         # Add some doors
-        for room in rooms:
-            x, y, w, h = room
+        tiles = self.tiles
+        FLOOR, WALL, DOOR = TileType.FLOOR.value, TileType.WALL.value, TileType.DOOR.value
+        for x, y, w, h in rooms.tolist():
             # Potentially add doors at room edges
             for room_x in range(x, x + w):
                 if room_x > 0 and room_x < self.width - 1:
                     # Check north wall
-                    if y > 1 and self.tiles[y-1][room_x] == TileType.WALL and self.tiles[y-2][room_x] == TileType.FLOOR:
+                    if y > 1 and tiles[y-1, room_x] == WALL and tiles[y-2, room_x] == FLOOR:
                         if random.random() < 0.3:
-                            self.tiles[y-1][room_x] = TileType.DOOR
+                            tiles[y-1, room_x] = DOOR
                             self.add_interactable_position(room_x, y-1)
                     
                     # Check south wall
-                    if y+h < self.height-1 and self.tiles[y+h][room_x] == TileType.WALL and self.tiles[y+h+1][room_x] == TileType.FLOOR:
+                    if y+h < self.height-1 and tiles[y+h, room_x] == WALL and tiles[y+h+1, room_x] == FLOOR:
                         if random.random() < 0.3:
-                            self.tiles[y+h][room_x] = TileType.DOOR
+                            tiles[y+h, room_x] = DOOR
                             self.add_interactable_position(room_x, y+h)
             
             for room_y in range(y, y + h):
                 if room_y > 0 and room_y < self.height - 1:
                     # Check west wall
-                    if x > 1 and self.tiles[room_y][x-1] == TileType.WALL and self.tiles[room_y][x-2] == TileType.FLOOR:
+                    if x > 1 and tiles[room_y, x-1] == WALL and tiles[room_y, x-2] == FLOOR:
                         if random.random() < 0.3:
-                            self.tiles[room_y][x-1] = TileType.DOOR
+                            tiles[room_y, x-1] = DOOR
                             self.add_interactable_position(x-1, room_y)
                     
                     # Check east wall
-                    if x+w < self.width-1 and self.tiles[room_y][x+w] == TileType.WALL and self.tiles[room_y][x+w+1] == TileType.FLOOR:
+                    if x+w < self.width-1 and tiles[room_y, x+w] == WALL and tiles[room_y, x+w+1] == FLOOR:
                         if random.random() < 0.3:
-                            self.tiles[room_y][x+w] = TileType.DOOR
+                            tiles[room_y, x+w] = DOOR
                             self.add_interactable_position(x+w, room_y)
     
     def create_horizontal_tunnel(self, x1: int, x2: int, y: int):
         """Create a horizontal tunnel between x1 and x2 at y"""
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            if self.is_within_bounds(x, y):
-                self.tiles[y][x] = TileType.FLOOR
+        self.invalidate_cache()
+        if 0 <= y < self.height:
+            start, end = max(0, min(x1, x2)), min(self.width, max(x1, x2) + 1)
+            self.tiles[y, start:end] = TileType.FLOOR.value
     
     def create_vertical_tunnel(self, y1: int, y2: int, x: int):
         """Create a vertical tunnel between y1 and y2 at x"""
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            if self.is_within_bounds(x, y):
-                self.tiles[y][x] = TileType.FLOOR
+        self.invalidate_cache()
+        if 0 <= x < self.width:
+            start, end = max(0, min(y1, y2)), min(self.height, max(y1, y2) + 1)
+            self.tiles[start:end, x] = TileType.FLOOR.value
+
+
+def _read_world_file(path: str) -> Dict:
+    """Parse a world JSON file"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _json_default(value):
+    """Convert the NumPy values json can't serialize, as orjson does"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_world_file(path: str, data: Dict):
+    """Write a world JSON file; NumPy arrays in data are written as nested lists"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY))
+        return
+    with open(path, 'w') as f:
+        json.dump(data, f, default=_json_default)
+
+
+def _mark_positions(grid: np.ndarray, positions) -> None:
+    """Set grid[y, x] for every in-bounds (x, y) in positions"""
+    positions = np.asarray(positions, dtype=np.intp).reshape(-1, 2)
+    xs, ys = positions[:, 0], positions[:, 1]
+    height, width = grid.shape
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    grid[ys[inside], xs[inside]] = True
 
 
 def load_world(level_name: str) -> World:
@@ -384,8 +592,7 @@ def load_world(level_name: str) -> World:
     
     if os.path.exists(world_file):
         try:
-            with open(world_file, 'r') as f:
-                data = json.load(f)
+            data = _read_world_file(world_file)
                 
             # Create world with specified dimensions
             world = World(
@@ -395,17 +602,27 @@ def load_world(level_name: str) -> World:
             )
             world.name = data.get("name", level_name)
             
-            # Load tiles
+            # Load tiles straight into a uint8 array
             tile_data = data.get("tiles", [])
-            for y, row in enumerate(tile_data):
-                for x, tile_value in enumerate(row):
-                    world.tiles[y][x] = TileType(tile_value)
+            if tile_data:
+                tiles = np.asarray(tile_data, dtype=np.uint8)
+                if tiles.max() > _MAX_TILE_VALUE:
+                    raise ValueError(f"Invalid tile value {tiles.max()}")
+                if tiles.shape == world.tiles.shape:
+                    world.tiles = tiles
+                else:
+                    world.tiles[:tiles.shape[0], :tiles.shape[1]] = tiles
             
-            # Load tile properties
+            # Load tile properties, mirroring "blocked" into its grid
             properties_data = data.get("tile_properties", {})
-            for pos_str, props in properties_data.items():
-                x, y = map(int, pos_str.split(","))
-                world.tile_properties[(x, y)] = props
+            world.tile_properties = {
+                tuple(map(int, pos_str.split(","))): props
+                for pos_str, props in properties_data.items()
+            }
+            _mark_positions(world.blocked, [
+                pos for pos, props in world.tile_properties.items()
+                if props.get("blocked", False)
+            ])
             
             # Load regions
             regions_data = data.get("regions", {})
@@ -413,10 +630,7 @@ def load_world(level_name: str) -> World:
                 world.regions[region_id] = region_data
             
             # Load interactable positions
-            interactable_data = data.get("interactable_positions", [])
-            for pos_data in interactable_data:
-                x, y = pos_data
-                world.interactable_positions.add((x, y))
+            _mark_positions(world.interactable, data.get("interactable_positions", []))
             
             return world
         except Exception as e:
@@ -442,21 +656,14 @@ def save_world(world: World, level_name: str):
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(world_file), exist_ok=True)
     
-    # Convert tile grid to serializable format
-    tile_data = []
-    for row in world.tiles:
-        tile_data.append([tile.value for tile in row])
-    
     # Convert tile properties to serializable format
     properties_data = {}
     for pos, props in world.tile_properties.items():
         x, y = pos
         properties_data[f"{x},{y}"] = props
     
-    # Convert interactable positions to serializable format
-    interactable_data = []
-    for pos in world.interactable_positions:
-        interactable_data.append(pos)
+    # Interactable positions as (x, y) rows
+    interactable_data = np.ascontiguousarray(np.argwhere(world.interactable)[:, ::-1])
     
     # Create world data
     data = {
@@ -464,12 +671,11 @@ def save_world(world: World, level_name: str):
         "width": world.width,
         "height": world.height,
         "tile_size": world.tile_size,
-        "tiles": tile_data,
+        "tiles": world.tiles,
         "tile_properties": properties_data,
         "regions": world.regions,
         "interactable_positions": interactable_data
     }
     
     # Save to file
-    with open(world_file, 'w') as f:
-        json.dump(data, f) 
\ No newline at end of file
+    _write_world_file(world_file, data) 
\ No newline at end of file
@@ -10,6 +10,14 @@ setup(
         "pydantic>=2.0.0",
         "maturin>=1.0.0",
     ],
+    extras_require={
+        "jit": [
+            "numba>=0.56.0",
+        ],
+        "fast-io": [
+            "orjson>=3.6.0",
+        ],
+    },
     python_requires=">=3.8",
     author="LlamaSearch AI",
     author_email="info@llamasearch.ai",
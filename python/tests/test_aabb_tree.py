@@ -0,0 +1,101 @@
+"""
+Tests for the entity broadphase AABB tree
+"""
+
+import random
+
+from llamaquest.entities import AABBTree, Enemy
+from llamaquest.game import GameState
+
+
+def overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def check_node(node):
+    """Assert the structural invariants below node and return its height"""
+    if node.left is None:
+        assert node.height == 0
+        return 0
+    assert node.left.parent is node and node.right.parent is node
+    left_height, right_height = check_node(node.left), check_node(node.right)
+    assert node.height == 1 + max(left_height, right_height)
+    left, right = node.left.box, node.right.box
+    assert node.box == (min(left[0], right[0]), min(left[1], right[1]),
+                        max(left[2], right[2]), max(left[3], right[3]))
+    return node.height
+
+
+def test_random_operations_match_brute_force():
+    """Test that queries find every overlap after random inserts, moves and removes."""
+    rng = random.Random(5)
+    tree = AABBTree(margin=4)
+    boxes = {}
+    for step in range(4000):
+        key = rng.randrange(200)
+        x, y = rng.randint(0, 500), rng.randint(0, 500)
+        op = rng.random()
+        if op < 0.4:
+            boxes[key] = (x, y, x + 8, y + 8)
+            tree.insert(key, boxes[key])
+        elif op < 0.8 and key in boxes:
+            ox, oy = boxes[key][:2]
+            nx, ny = ox + rng.randint(-6, 6), oy + rng.randint(-6, 6)
+            boxes[key] = (nx, ny, nx + 8, ny + 8)
+            tree.update(key, boxes[key])
+        elif key in boxes:
+            tree.remove(key)
+            del boxes[key]
+        
+        if step % 100 == 0:
+            assert len(tree) == len(boxes)
+            if tree.root is not None:
+                assert tree.root.parent is None
+                check_node(tree.root)
+            qx, qy = rng.randint(0, 500), rng.randint(0, 500)
+            query = (qx, qy, qx + 60, qy + 60)
+            found = set(tree.query(query))
+            exact = {k for k, box in boxes.items() if overlaps(box, query)}
+            # Fat boxes may add near misses but never drop a real overlap
+            assert exact <= found
+            fat = {k for k, box in boxes.items()
+                   if overlaps((box[0] - 4, box[1] - 4, box[2] + 4, box[3] + 4), query)}
+            assert found <= fat
+
+
+def test_small_moves_stay_inside_the_fat_box():
+    """Test that small moves leave the tree alone and large ones re-insert."""
+    tree = AABBTree(margin=8)
+    tree.insert("a", (0, 0, 8, 8))
+    tree.insert("b", (100, 100, 108, 108))
+    assert tree.update("a", (5, 5, 13, 13)) is False
+    assert tree.update("a", (50, 50, 58, 58)) is True
+    assert tree.query((45, 45, 60, 60)) == ["a"]
+
+
+def test_remove_empties_the_tree():
+    """Test that removing every object leaves an empty tree."""
+    tree = AABBTree()
+    for i in range(10):
+        tree.insert(i, (i * 20, 0, i * 20 + 8, 8))
+    for i in range(10):
+        tree.remove(i)
+    assert len(tree) == 0
+    assert tree.root is None
+    assert tree.query((0, 0, 1000, 1000)) == []
+
+
+def test_state_queries_only_see_live_entities():
+    """Test that each game state's tree only returns entities still in that state."""
+    everywhere = (-1000, -1000, 1000, 1000)
+    old = Enemy(0, 0, "old", "Old", 0, 0, health=10, damage=1)
+    first = GameState(player=None, world=None, npcs={}, entities=[old])
+    
+    live = Enemy(4, 4, "live", "Live", 0, 0, health=10, damage=1)
+    gone = Enemy(40, 40, "gone", "Gone", 0, 0, health=10, damage=1)
+    second = GameState(player=None, world=None, npcs={}, entities=[live, gone])
+    second.remove_entity(gone)
+    gone.x = 4  # Moving a despawned entity must not bring it back
+    
+    assert second.entity_manager.tree.query(everywhere) == [live]
+    assert first.entity_manager.tree.query(everywhere) == [old]
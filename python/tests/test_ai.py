@@ -0,0 +1,47 @@
+"""
+Tests for NPC mood reactions
+"""
+
+import pytest
+
+from llamaquest.ai import NPCBehavior, NPCMood, NPCPersonality
+
+
+def make_npc(courage=0.5, curiosity=0.5):
+    traits = {"friendliness": 0.5, "intelligence": 0.5, "courage": courage,
+              "patience": 0.5, "curiosity": curiosity}
+    return NPCBehavior("npc_1", "Elwin", NPCPersonality(traits))
+
+
+@pytest.mark.parametrize("action, mood", [
+    ("attack", NPCMood.SCARED),
+    ("ATTACKING the guard", NPCMood.SCARED),
+    ("player_attack", NPCMood.SCARED),
+    ("counterattack", NPCMood.SCARED),
+    ("give_gift", NPCMood.FRIENDLY),
+    ("use_help", NPCMood.FRIENDLY),
+    ("helped", NPCMood.FRIENDLY),
+    ("Gifts!", NPCMood.FRIENDLY),
+    ("ask_question", NPCMood.CURIOUS),
+    ("questions", NPCMood.CURIOUS),
+    ("gift then attack", NPCMood.SCARED),  # Attacks win over everything else
+    ("help with a question", NPCMood.FRIENDLY),
+])
+def test_keywords_match_anywhere_in_the_action(action, mood):
+    """Test that keywords are found inside words, as substrings."""
+    npc = make_npc(courage=0.5, curiosity=0.9)
+    assert npc.update_mood(action, {}) == mood
+
+
+def test_other_actions_keep_the_mood():
+    """Test that actions without keywords leave the mood unchanged."""
+    npc = make_npc()
+    npc.update_mood("give_gift", {})
+    assert npc.update_mood("wave", {}) == NPCMood.FRIENDLY
+    assert npc.recent_summary()["action_counts"] == {"friendly": 1, "other": 1}
+
+
+def test_traits_pick_the_reaction():
+    """Test that courage and curiosity choose between the possible moods."""
+    assert make_npc(courage=0.9).update_mood("attack", {}) == NPCMood.HOSTILE
+    assert make_npc(curiosity=0.2).update_mood("question", {}) == NPCMood.NEUTRAL
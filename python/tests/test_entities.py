@@ -0,0 +1,114 @@
+"""
+Tests for entity storage and game state membership
+"""
+
+import numpy as np
+import pytest
+
+from llamaquest.entities import Enemy, EntityManager, InteractiveObject, PLAYER_VICINITY_RANGE
+from llamaquest.game import GameState
+
+
+def make_enemy(x, y):
+    return Enemy(x, y, "slime", "Slime", 0, 0, health=10, damage=1)
+
+
+def make_state(*entities):
+    return GameState(player=None, world=None, npcs={}, entities=list(entities))
+
+
+def columns(manager):
+    arrays = manager.arrays
+    n = arrays.count
+    return np.stack([arrays.xs[:n], arrays.ys[:n], arrays.ws[:n], arrays.hs[:n]], axis=1)
+
+
+def test_columns_mirror_entities():
+    """Test that the manager's columns follow position changes."""
+    manager = EntityManager(capacity=1)
+    enemies = [make_enemy(i * 10, i * 5) for i in range(5)]
+    for enemy in enemies:
+        manager.add(enemy)
+    enemies[2].x = 7.5
+    enemies[3].y = -2
+    
+    expected = [(e.x, e.y, e.sprite_width, e.sprite_height) for e in manager.entities]
+    np.testing.assert_array_equal(columns(manager), expected)
+
+
+def test_removed_entity_leaves_other_rows_alone():
+    """Test that moving a removed entity does not touch the remaining rows."""
+    manager = EntityManager()
+    a, b, c = make_enemy(0, 0), make_enemy(20, 0), make_enemy(40, 0)
+    for enemy in (a, b, c):
+        manager.add(enemy)
+    manager.remove(a)
+    before = columns(manager).copy()
+    
+    a.x = 999
+    a.y = 999
+    assert (a.x, a.y) == (999, 999)
+    np.testing.assert_array_equal(columns(manager), before)
+    assert manager.entities == [c, b]
+    assert a not in manager
+    with pytest.raises(ValueError):
+        manager.remove(a)
+
+
+def test_entity_belongs_to_one_state():
+    """Test that each state only tracks the entities added to it."""
+    first = make_state(make_enemy(0, 0))
+    enemy = make_enemy(0, 0)
+    second = make_state(enemy)
+    
+    assert len(first.entity_manager) == 1
+    assert second.entity_manager.entities == [enemy]
+    with pytest.raises(ValueError):
+        first.add_entity(enemy)
+    
+    second.remove_entity(enemy)
+    assert second.entities == []
+    assert len(second.entity_manager) == 0
+    first.add_entity(enemy)
+    assert enemy in first.entity_manager
+
+
+def test_entities_are_filed_by_kind():
+    """Test that add_entity files objects into the matching state list."""
+    state = make_state()
+    door = InteractiveObject(8, 8, "door", "Door", 0, 0, "door")
+    enemy = make_enemy(0, 0)
+    state.add_entity(door)
+    state.add_entity(enemy)
+    assert state.interactive_objects == [door]
+    assert state.entities == [enemy]
+    assert len(state.entity_manager) == 2
+
+
+def test_size_survives_fractional_moves():
+    """Test that sprite sizes stay exact ints however the entity moves."""
+    door = InteractiveObject(0, 0, "door", "Door", 16, 0, "door")
+    for _ in range(1000):
+        door.x += 0.1
+        door.y += 0.3
+    assert door.sprite_width == 8 and type(door.sprite_width) is int
+    assert door._blt_args[5:7] == (8, 8)
+    
+    door.open_door(None, None)
+    assert door.sprite_x == 24 and type(door.sprite_x) is int
+
+
+def test_tracking_range_follows_enemies():
+    """Test that the cached tracking range covers the furthest-tracking enemy."""
+    scout = make_enemy(0, 0)
+    scout.detection_range = 200
+    state = make_state(make_enemy(0, 0), scout)
+    assert state.tracking_range == 300
+    
+    sentry = make_enemy(0, 0)
+    sentry.detection_range = 400
+    state.add_entity(sentry)
+    assert state.tracking_range == 600
+    state.remove_entity(sentry)
+    state.remove_entity(scout)
+    assert state.tracking_range == PLAYER_VICINITY_RANGE
@@ -0,0 +1,62 @@
+"""
+Tests for the shadowcasting field of view
+"""
+
+import numpy as np
+
+from llamaquest import calculate_field_of_view, cached_field_of_view, clear_fov_cache
+from llamaquest.world import World, TileType
+
+
+def test_open_field_is_a_disk():
+    """Test that an open field is visible exactly within the radius."""
+    obstacles = np.zeros((31, 31), dtype=bool)
+    visible = np.asarray(calculate_field_of_view(15, 15, 7, obstacles), dtype=bool)
+
+    ys, xs = np.mgrid[0:31, 0:31]
+    np.testing.assert_array_equal(visible, (xs - 15) ** 2 + (ys - 15) ** 2 <= 49)
+
+
+def test_radius_window_is_clipped_to_the_map():
+    """Test that a radius reaching past the map edges is clipped to the map."""
+    obstacles = np.zeros((5, 8), dtype=bool)
+    visible = np.asarray(calculate_field_of_view(0, 0, 20, obstacles), dtype=bool)
+    assert visible.shape == (5, 8)
+    assert visible.all()
+
+
+def test_walls_are_visible_and_block_sight():
+    """Test that walls are seen but hide the cells behind them."""
+    obstacles = np.zeros((21, 21), dtype=bool)
+    obstacles[5:16, 12] = True  # Wall two cells east of the origin
+    visible = np.asarray(calculate_field_of_view(10, 10, 8, obstacles), dtype=bool)
+
+    assert visible[10, 10]
+    assert visible[10, 12]
+    assert not visible[10, 13:19].any()
+    assert visible[10, 3]  # Nothing to the west
+
+
+def test_cached_results_are_shared_and_read_only():
+    """Test that repeat lookups share one read-only result until the version moves on."""
+    clear_fov_cache()
+    obstacles = np.zeros((10, 10), dtype=bool)
+    first = cached_field_of_view(5, 5, 3, obstacles, map_version=0)
+    assert cached_field_of_view(5, 5, 3, obstacles, map_version=0) is first
+    assert not first.flags.writeable
+    assert cached_field_of_view(5, 5, 3, obstacles, map_version=1) is not first
+
+
+def test_world_field_of_view_follows_tile_changes():
+    """Test that World.field_of_view hits the cache and sees new walls."""
+    clear_fov_cache()
+    world = World(20, 20)
+    world.generate_empty_world()
+    before = world.field_of_view(10, 10, 6)
+    assert world.field_of_view(10, 10, 6) is before
+    assert before[10, 14]
+    
+    world.set_tile(12, 10, TileType.WALL)
+    after = world.field_of_view(10, 10, 6)
+    assert after[10, 12]
+    assert not after[10, 14]
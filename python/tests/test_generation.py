@@ -0,0 +1,78 @@
+"""
+Tests for world and dungeon generation
+"""
+
+import random
+from collections import deque
+
+import numpy as np
+
+from llamaquest.world import World, TileType
+
+
+def generate(kind, seed, size=64):
+    random.seed(seed)
+    world = World(size, size)
+    if kind == "dungeon":
+        world.generate_dungeon()
+    else:
+        world.generate_random_world()
+    return world
+
+
+def connected(mask):
+    """Whether the True cells of mask form one 4-connected region"""
+    cells = np.argwhere(mask)
+    if not len(cells):
+        return True
+    start = tuple(cells[0])
+    seen = {start}
+    queue = deque([start])
+    height, width = mask.shape
+    while queue:
+        y, x = queue.popleft()
+        for ny, nx in ((y + 1, x), (y - 1, x), (y, x + 1), (y, x - 1)):
+            if 0 <= ny < height and 0 <= nx < width and mask[ny, nx] and (ny, nx) not in seen:
+                seen.add((ny, nx))
+                queue.append((ny, nx))
+    return len(seen) == len(cells)
+
+
+def test_generation_is_reproducible():
+    """Test that random.seed() reproduces both kinds of world."""
+    for kind in ("terrain", "dungeon"):
+        a, b = generate(kind, 3), generate(kind, 3)
+        np.testing.assert_array_equal(a.tiles, b.tiles)
+        np.testing.assert_array_equal(a.interactable, b.interactable)
+        assert not np.array_equal(a.tiles, generate(kind, 4).tiles)
+
+
+def test_generation_leaves_numpy_rng_alone():
+    """Test that generating worlds does not reseed NumPy's global RNG."""
+    np.random.seed(1234)
+    expected = np.random.random(4)
+    np.random.seed(1234)
+    generate("terrain", 1)
+    generate("dungeon", 1)
+    np.testing.assert_array_equal(np.random.random(4), expected)
+
+
+def test_terrain_uses_terrain_tiles():
+    """Test that terrain is grass with water, paths, trees and rocks."""
+    world = generate("terrain", 5)
+    values = set(np.unique(world.tiles).tolist())
+    terrain = {TileType.GRASS, TileType.WATER, TileType.PATH, TileType.TREE, TileType.ROCK}
+    assert values <= {tile.value for tile in terrain}
+    assert {TileType.GRASS.value, TileType.WATER.value, TileType.PATH.value} <= values
+
+
+def test_dungeon_rooms_are_connected():
+    """Test that every floor tile of a dungeon can reach every other one."""
+    for seed in range(5):
+        world = generate("dungeon", seed)
+        tiles = world.tiles
+        assert set(np.unique(tiles).tolist()) <= {TileType.FLOOR.value, TileType.WALL.value,
+                                                  TileType.DOOR.value}
+        assert (tiles[0] == TileType.WALL.value).all() and (tiles[:, 0] == TileType.WALL.value).all()
+        assert connected((tiles == TileType.FLOOR.value) | (tiles == TileType.DOOR.value))
+        np.testing.assert_array_equal(world.interactable, tiles == TileType.DOOR.value)
@@ -0,0 +1,88 @@
+"""
+Tests for the pathfinding core
+"""
+
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+import llamaquest
+from llamaquest import calculate_pathfinding
+
+
+def bfs_length(grid, start, goal):
+    """Number of steps on a shortest 4-connected path, or None if unreachable"""
+    height, width = len(grid), len(grid[0])
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) == goal:
+            return dist[(x, y)]
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and grid[ny][nx] and (nx, ny) not in dist:
+                dist[(nx, ny)] = dist[(x, y)] + 1
+                queue.append((nx, ny))
+    return None
+
+
+def random_cases(count, seed=1):
+    """Yield (grid, start, goal) for random grids of mostly walkable tiles"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        width, height = rng.randint(1, 25), rng.randint(1, 25)
+        grid = [[rng.random() < 0.7 for _ in range(width)] for _ in range(height)]
+        start = (rng.randrange(width), rng.randrange(height))
+        goal = (rng.randrange(width), rng.randrange(height))
+        yield grid, start, goal
+
+
+@pytest.mark.parametrize("as_array", [False, True], ids=["lists", "uint8 array"])
+def test_paths_are_shortest_and_valid(as_array):
+    """Test that found paths are shortest, connected and stay on walkable tiles."""
+    for grid, (sx, sy), (ex, ey) in random_cases(200):
+        walkable_map = np.array(grid, dtype=np.uint8) if as_array else grid
+        path = calculate_pathfinding(sx, sy, ex, ey, walkable_map, 100000)
+        
+        expected = bfs_length(grid, (sx, sy), (ex, ey)) if grid[sy][sx] and grid[ey][ex] else None
+        if expected is None:
+            assert path == []
+            continue
+        
+        assert len(path) == expected + 1
+        assert path[0] == (sx, sy) and path[-1] == (ex, ey)
+        for (ax, ay), (bx, by) in zip(path, path[1:]):
+            assert abs(ax - bx) + abs(ay - by) == 1
+            assert grid[by][bx]
+
+
+def test_out_of_bounds_or_blocked_endpoints():
+    """Test that no path is returned for endpoints off the map or on walls."""
+    grid = [[True, True], [True, False]]
+    assert calculate_pathfinding(0, 0, 2, 0, grid) == []
+    assert calculate_pathfinding(-1, 0, 1, 0, grid) == []
+    assert calculate_pathfinding(0, 0, 1, 1, grid) == []
+
+
+def test_max_steps_limits_the_search():
+    """Test that the search gives up after max_steps expansions."""
+    grid = [[True] * 50 for _ in range(50)]
+    assert calculate_pathfinding(0, 0, 49, 49, grid, max_steps=5) == []
+    assert len(calculate_pathfinding(0, 0, 49, 49, grid)) == 99
+
+
+@pytest.mark.skipif(not hasattr(llamaquest, "_astar_python"), reason="Rust core installed")
+def test_python_fallback_reads_flat_grids():
+    """Test the pure-Python A* over a flat row-major buffer, as used without numba."""
+    for grid, (sx, sy), (ex, ey) in random_cases(100, seed=2):
+        if not (grid[sy][sx] and grid[ey][ex]):
+            continue
+        height, width = len(grid), len(grid[0])
+        flat = bytes(np.array(grid, dtype=np.uint8).ravel())
+        path = llamaquest._astar_python(sx, sy, ex, ey, flat, width, height, 100000)
+        
+        expected = bfs_length(grid, (sx, sy), (ex, ey))
+        assert len(path) == (0 if expected is None else expected + 1)
@@ -0,0 +1,98 @@
+"""
+Tests for the world grid and its derived maps
+"""
+
+import numpy as np
+import pytest
+
+from llamaquest.world import World, TileType
+
+
+def make_world(width=12, height=8):
+    world = World(width, height)
+    world.generate_empty_world()
+    return world
+
+
+def test_walkable_grid_follows_tiles_and_properties():
+    """Test that the walkable grid tracks tiles, blocked properties and rules."""
+    world = make_world()
+    grid = world.walkable_grid()
+    assert grid.dtype == np.uint8 and grid.shape == (8, 12)
+    assert grid.all()
+    
+    world.set_tile(3, 2, TileType.WALL)
+    world.set_tile_properties(5, 4, {"blocked": True})
+    assert world.walkable_grid() is grid  # Refreshed in place
+    assert grid[2, 3] == 0 and grid[4, 5] == 0
+    assert grid.sum() == 12 * 8 - 2
+    
+    world.walkable_tiles = {TileType.GRASS}
+    assert not world.walkable_grid().any()
+
+
+def test_find_path_goes_around_walls():
+    """Test that World.find_path routes around walls and gives up when cut off."""
+    world = make_world()
+    for y in range(0, 7):
+        world.set_tile(6, y, TileType.WALL)
+    
+    path = world.find_path(2, 2, 10, 2)
+    assert path[0] == (2, 2) and path[-1] == (10, 2)
+    assert (6, 7) in path
+    assert len(path) == 19
+    
+    world.set_tile(6, 7, TileType.WATER)
+    assert world.find_path(2, 2, 10, 2) == []
+
+
+def test_tiles_are_a_uint8_grid():
+    """Test that tiles are stored as values in a (height, width) uint8 array."""
+    world = World(5, 3)
+    assert world.tiles.dtype == np.uint8 and world.tiles.shape == (3, 5)
+    assert world.get_tile(0, 0) is TileType.EMPTY
+    
+    version = world.version
+    world.set_tile(4, 2, TileType.DOOR)
+    assert world.tiles[2, 4] == TileType.DOOR.value
+    assert world.get_tile(4, 2) is TileType.DOOR
+    assert world.version == version + 1
+
+
+def test_out_of_bounds_tiles_are_empty():
+    """Test that reads off the map are EMPTY and writes off the map are ignored."""
+    world = make_world(4, 4)
+    version = world.version
+    world.set_tile(4, 0, TileType.WALL)
+    world.set_tile(-1, 2, TileType.WALL)
+    assert world.version == version
+    assert world.get_tile(4, 0) is TileType.EMPTY
+    assert world.get_tile(0, -1) is TileType.EMPTY
+    assert (world.tiles == TileType.FLOOR.value).all()
+
+
+def test_walkability_uses_the_tile_rules():
+    """Test that walkability follows walkable_tiles, in pixel coordinates."""
+    world = make_world(4, 4)
+    world.set_tile(1, 0, TileType.WATER)
+    world.set_tile(2, 0, TileType.BRIDGE)
+    
+    assert world.is_position_walkable(0, 0) is True
+    assert world.is_position_walkable(8 + 7, 7) is False  # Anywhere in the water tile
+    assert world.is_position_walkable(16, 0) is True
+    assert world.is_position_walkable(-1, 0) is False
+    assert world.is_position_walkable(32, 0) is False
+    
+    world.walkable_tiles = world.walkable_tiles | {TileType.WATER}
+    assert world.is_position_walkable(8, 0) is True
+    world.walkable_tiles = set()
+    assert world.is_position_walkable(0, 0) is False
+
+
+def test_blocked_tiles_are_not_walkable():
+    """Test that a "blocked" tile property overrides the tile type."""
+    world = make_world(4, 4)
+    world.set_tile_properties(1, 1, {"blocked": True})
+    assert world.is_position_walkable(8, 8) is False
+    world.set_tile_properties(1, 1, {"blocked": False})
+    assert world.is_position_walkable(8, 8) is True
@@ -0,0 +1,74 @@
+"""
+Tests for saving and loading worlds
+"""
+
+import numpy as np
+import pytest
+
+from llamaquest import world as world_module
+from llamaquest.world import World, TileType, load_world, save_world
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch, tmp_path):
+    """Run in a scratch directory with each JSON backend"""
+    if request.param == "orjson" and world_module.orjson is None:
+        pytest.skip("orjson not installed")
+    if request.param == "json":
+        monkeypatch.setattr(world_module, "orjson", None)
+    monkeypatch.chdir(tmp_path)
+    return request.param
+
+
+def make_world():
+    world = World(6, 4)
+    world.name = "Test Keep"
+    world.generate_empty_world()
+    world.set_tile(2, 1, TileType.WALL)
+    world.set_tile(5, 3, TileType.DOOR)
+    world.set_tile_properties(1, 2, {"blocked": True, "label": "crate"})
+    world.add_interactable_position(5, 3)
+    world.add_region("hall", "Great Hall", 0, 0, 3, 2)
+    return world
+
+
+def test_round_trip(backend):
+    """Test that a saved world loads back with the same contents."""
+    world = make_world()
+    save_world(world, "keep")
+    loaded = load_world("keep")
+    
+    assert (loaded.name, loaded.width, loaded.height) == ("Test Keep", 6, 4)
+    assert loaded.tiles.dtype == np.uint8
+    np.testing.assert_array_equal(loaded.tiles, world.tiles)
+    assert loaded.tile_properties == {(1, 2): {"blocked": True, "label": "crate"}}
+    np.testing.assert_array_equal(loaded.blocked, world.blocked)
+    assert loaded.interactable_positions == {(5, 3)}
+    assert loaded.regions == world.regions
+    assert loaded.is_position_walkable(8, 16) is False
+
+
+def test_numpy_values_are_serialized(backend):
+    """Test that NumPy scalars in world data are written as plain numbers."""
+    world = make_world()
+    world.regions["hall"]["width"] = np.int64(3)
+    save_world(world, "keep")
+    assert load_world("keep").regions["hall"]["width"] == 3
+
+
+def test_unserializable_values_raise_type_error(backend):
+    """Test that values JSON can't hold raise TypeError with either backend."""
+    world = make_world()
+    world.regions["hall"]["tags"] = {"lit"}
+    with pytest.raises(TypeError):
+        save_world(world, "keep")
+
+
+def test_bad_tile_values_fall_back_to_generation(backend, capsys):
+    """Test that a file with unknown tile values is rejected and a world generated."""
+    world = make_world()
+    world.tiles[0, 0] = 200
+    save_world(world, "keep")
+    loaded = load_world("keep")
+    assert loaded.width == 128
+    assert "Invalid tile value 200" in capsys.readouterr().out
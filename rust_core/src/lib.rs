@@ -1,5 +1,6 @@
 use pyo3::prelude::*;
 use pyo3::wrap_pyfunction;
+use std::sync::OnceLock;
 
 /// A Rust module providing performance-critical functionality for LlamaQuest
 #[pymodule]
@@ -81,6 +82,19 @@ fn collision_detection(
     Ok(collision)
 }
 
+/// Unit ray directions (cos, sin) for every whole degree, computed once
+fn ray_directions() -> &'static [(f32, f32)] {
+    static DIRECTIONS: OnceLock<Vec<(f32, f32)>> = OnceLock::new();
+    DIRECTIONS.get_or_init(|| {
+        (0..360)
+            .map(|angle| {
+                let (sin, cos) = (angle as f32).to_radians().sin_cos();
+                (cos, sin)
+            })
+            .collect()
+    })
+}
+
 /// Calculate field of view for the player
 #[pyfunction]
 fn calculate_field_of_view(
@@ -104,14 +118,13 @@ fn calculate_field_of_view(
     // such as recursive shadowcasting for better performance
     
     // Cast rays in a circle
-    for angle in 0..360 {
-        let angle_rad = angle as f32 * std::f32::consts::PI / 180.0;
+    for &(dir_x, dir_y) in ray_directions() {
         let mut ray_x = origin_x as f32;
         let mut ray_y = origin_y as f32;
         
-        for step in 1..=radius {
-            ray_x += angle_rad.cos();
-            ray_y += angle_rad.sin();
+        for _ in 1..=radius {
+            ray_x += dir_x;
+            ray_y += dir_y;
             
             let tile_x = ray_x.round() as usize;
             let tile_y = ray_y.round() as usize;